@@ -0,0 +1,92 @@
+from functools import lru_cache
+
+import pygame as pg
+
+
+MAX_BIRD_ROTATION = 45  # Bird sprites are tilted within [-45, 45] degrees
+ROTATION_STEP = 1       # Angle resolution of the pre-rendered bird sprites, in degrees
+
+# Process-wide image cache: every image is read from disk and decoded once, on first use.
+# convert_alpha() needs a display, so nothing may be loaded before Game opens its window.
+
+def rotate_sprite(sprite: pg.Surface, angle: float) -> pg.Surface:
+    """
+    Rotates a sprite around its center without changing its dimensions.
+
+    Args:
+    sprite (pg.Surface): The sprite image to rotate.
+    angle (float): The angle in degrees to rotate the sprite.
+
+    Returns:
+    pg.Surface: The rotated sprite image.
+    """
+    orig_rect = sprite.get_rect()
+    rot_sprite = pg.transform.rotate(sprite, angle)
+    rot_rect = orig_rect.copy()
+    rot_rect.center = rot_sprite.get_rect().center
+    rot_sprite = rot_sprite.subsurface(rot_rect).copy()
+    return rot_sprite
+
+
+@lru_cache(maxsize=None)
+def load_image(path: str) -> pg.Surface:
+    """
+    Loads an image with per-pixel alpha, once per process.
+
+    Args:
+        path (str): Path of the image file.
+
+    Returns:
+        pg.Surface: The shared, converted image. Callers must not draw on it.
+    """
+    return pg.image.load(path).convert_alpha()
+
+
+@lru_cache(maxsize=None)
+def bird_sprites() -> dict:
+    """Returns the shared dictionary of bird sprites used for animation."""
+    return {
+        'midflap': load_image('sprites/bluebird-midflap.png'),
+        'downflap': load_image('sprites/bluebird-downflap.png'),
+        'upflap': load_image('sprites/bluebird-upflap.png')
+    }
+
+
+@lru_cache(maxsize=None)
+def rotated_bird_sprites() -> dict:
+    """
+    Pre-renders every bird sprite at every quantized angle.
+
+    Returns:
+        dict: Maps (sprite name, angle in degrees) to the rotated sprite.
+    """
+    angles = range(-MAX_BIRD_ROTATION, MAX_BIRD_ROTATION + 1, ROTATION_STEP)
+    return {(name, angle): rotate_sprite(sprite, angle)
+            for name, sprite in bird_sprites().items() for angle in angles}
+
+
+def rotated_bird_sprite(name: str, angle: float) -> pg.Surface:
+    """
+    Looks up a pre-rendered bird sprite.
+
+    Args:
+        name (str): 'midflap', 'downflap' or 'upflap'.
+        angle (float): Rotation in degrees, within [-MAX_BIRD_ROTATION, MAX_BIRD_ROTATION].
+
+    Returns:
+        pg.Surface: The sprite rotated by the angle rounded to ROTATION_STEP.
+    """
+    return rotated_bird_sprites()[name, int(round(angle / ROTATION_STEP)) * ROTATION_STEP]
+
+
+@lru_cache(maxsize=None)
+def pipe_images() -> tuple:
+    """Returns the shared (bottom, top) pipe images, the top one flipped."""
+    pipe_bottom_image = load_image('sprites/pipe-green.png')
+    return pipe_bottom_image, pg.transform.flip(pipe_bottom_image, False, True)
+
+
+@lru_cache(maxsize=None)
+def number_sprites() -> dict:
+    """Returns the shared dictionary mapping digits to their sprites."""
+    return {str(num): load_image(f'sprites/{num}.png') for num in range(10)}
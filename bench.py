@@ -0,0 +1,258 @@
+"""
+Throughput benchmarks for simulation, inference, evolution and rendering.
+
+Usage:
+    python bench.py [--sizes 200 2000 20000] [--min-time 1.0] [--output bench.json] [--skip-rendered]
+    python bench.py --startup [--startup-budget 500]
+
+Results are printed (or written) as JSON so that runs can be compared between releases.
+
+--startup measures the import time of each entry point with python -X importtime, in a fresh
+interpreter, and exits with an error if one is over budget or loads pygame, torch or matplotlib.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from utils import NUM_PARENTS
+from genome import random_genomes
+from training import selection, crossover, mutate
+
+BENCH_SEED = 0  # Seed of the genomes and of the course, so every run measures the same work
+
+# Entry points whose startup is checked, and the dependencies none of them may load on import
+STARTUP_MODULES = ('main', 'training', 'evaluation', 'inference', 'export', 'sweep', 'replay', 'plot')
+HEAVY_MODULES = ('pygame', 'torch', 'matplotlib', 'IPython')
+STARTUP_BUDGET_MS = 500
+
+
+def measure(function, min_time):
+    """
+    Calls a function repeatedly until at least min_time seconds have passed.
+
+    Args:
+        function (callable): Called with no argument, returns the number of units of work done.
+        min_time (float): Minimum measuring time in seconds.
+
+    Returns:
+        dict: Units of work, calls, seconds and units per second.
+    """
+    units = calls = 0
+    start = time.perf_counter()
+    while True:
+        units += function()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return {'units': units, 'calls': calls, 'seconds': elapsed, 'per_second': units / elapsed}
+
+
+def bench_generation(size, min_time, headless=True):
+    """Measures the frames per second of Game.run_generation for a random population."""
+    from game import Game
+
+    genomes = random_genomes(size, np.random.default_rng(BENCH_SEED))
+    game = Game(headless=headless)
+    if not headless:
+        game.fps = 0  # Measure the rendering cost, not the frame cap
+
+    def run():
+        game.reset(genomes, BENCH_SEED)
+        game.run_generation()
+        return game.pipe.frame
+    return measure(run, min_time)
+
+
+def bench_predict(size, min_time):
+    """Measures NeuralNet.predict calls per second, one call per bird of a frame."""
+    from genome import to_network
+
+    rng = np.random.default_rng(BENCH_SEED)
+    network = to_network(random_genomes(1, rng)[0])
+    states = rng.normal(size=(size, 4))
+
+    def run():
+        for state in states:
+            network.predict(state)
+        return size
+    return measure(run, min_time)
+
+
+def bench_numpy_predict(size, min_time):
+    """Measures NumpyNet.predict calls per second, the torch-free counterpart of bench_predict."""
+    from inference import NumpyNet
+
+    rng = np.random.default_rng(BENCH_SEED)
+    network = NumpyNet.from_genome(random_genomes(1, rng)[0])
+    states = rng.normal(size=(size, 4))
+
+    def run():
+        for state in states:
+            network.predict(state)
+        return size
+    return measure(run, min_time)
+
+
+def bench_policy(size, min_time):
+    """Measures batched PopulationPolicy decisions per second, one batch per frame."""
+    from policy import PopulationPolicy
+
+    rng = np.random.default_rng(BENCH_SEED)
+    policy = PopulationPolicy(random_genomes(size, rng))
+    states = rng.normal(size=(size, 4))
+
+    def run():
+        policy.decide(states)
+        return size
+    return measure(run, min_time)
+
+
+def bench_reproduction(size, min_time):
+    """Measures one selection, crossover and mutation step, in genomes produced per second."""
+    rng = np.random.default_rng(BENCH_SEED)
+    genomes = random_genomes(size, rng)
+    scores = rng.integers(0, 50, size)
+
+    def run():
+        mutate(crossover(selection(genomes, scores, NUM_PARENTS), size, rng), rng)
+        return size
+    return measure(run, min_time)
+
+
+def bench_full_generation(size, min_time):
+    """Measures one headless generation followed by reproduction, in generations per second."""
+    from evaluation import evaluate_genomes
+
+    rng = np.random.default_rng(BENCH_SEED)
+    genomes = random_genomes(size, rng)
+
+    def run():
+        scores = evaluate_genomes(genomes, BENCH_SEED)
+        mutate(crossover(selection(genomes, scores, NUM_PARENTS), size, rng), rng)
+        return 1
+    return measure(run, min_time)
+
+
+def bench_startup(module):
+    """
+    Measures the import of a module in a fresh interpreter with python -X importtime.
+
+    Args:
+        module (str): Name of the module to import.
+
+    Returns:
+        dict: Cumulative import time in milliseconds and the heavy modules it loaded.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        # Lines look like 'import time:   self [us] | cumulative | imported package'
+        fields = line.split('|')
+        if line.startswith('import time:') and fields[1].strip().isdigit():
+            cumulative[fields[2].strip()] = int(fields[1])
+    heavy = sorted({name.split('.')[0] for name in cumulative} & set(HEAVY_MODULES))
+    return {'import_ms': cumulative[module] / 1e3, 'heavy_modules': heavy}
+
+
+def check_startup(budget_ms=STARTUP_BUDGET_MS):
+    """
+    Measures the startup of every entry point against a budget.
+
+    Args:
+        budget_ms (float): Maximum import time of each entry point, in milliseconds.
+
+    Returns:
+        tuple: Results keyed by module, and the list of failures (empty if every check passed).
+    """
+    results, failures = {}, []
+    for module in STARTUP_MODULES:
+        results[module] = bench_startup(module)
+        if results[module]['import_ms'] > budget_ms:
+            failures.append(f"{module} takes {results[module]['import_ms']:.0f} ms to import (budget {budget_ms} ms)")
+        if results[module]['heavy_modules']:
+            failures.append(f"{module} imports {', '.join(results[module]['heavy_modules'])}")
+    return results, failures
+
+
+def environment():
+    """Describes the machine and library versions the benchmarks ran on."""
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'torch': torch.__version__ if torch else None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def run_benchmarks(sizes, min_time, rendered=True):
+    """
+    Runs every benchmark at every population size.
+
+    Args:
+        sizes (list of int): Population sizes.
+        min_time (float): Minimum measuring time of each benchmark, in seconds.
+        rendered (bool): If False, skip the rendered-mode benchmark.
+
+    Returns:
+        dict: Environment and results, keyed by benchmark then by population size.
+    """
+    benchmarks = {
+        'generation_headless_fps': lambda size: bench_generation(size, min_time),
+        'predict_calls_per_second': lambda size: bench_predict(size, min_time),
+        'numpy_predict_calls_per_second': lambda size: bench_numpy_predict(size, min_time),
+        'policy_decisions_per_second': lambda size: bench_policy(size, min_time),
+        'reproduction_genomes_per_second': lambda size: bench_reproduction(size, min_time),
+        'full_generations_per_second': lambda size: bench_full_generation(size, min_time),
+    }
+    if rendered:
+        benchmarks['generation_rendered_fps'] = lambda size: bench_generation(size, min_time, headless=False)
+
+    results = {}
+    for name, bench in benchmarks.items():
+        results[name] = {}
+        for size in sizes:
+            results[name][str(size)] = bench(size)
+            print(f"{name} [{size}]: {results[name][str(size)]['per_second']:.1f}/s", file=sys.stderr)
+    return {'environment': environment(), 'min_time': min_time, 'results': results}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark Flocky Bird throughput.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 2000, 20000], help='population sizes')
+    parser.add_argument('--min-time', type=float, default=1.0, help='minimum seconds per measurement')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--skip-rendered', action='store_true', help='skip the rendered-mode benchmark')
+    parser.add_argument('--startup', action='store_true', help='only check the import time of the entry points')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS, help='import time budget in ms')
+    args = parser.parse_args()
+
+    if args.startup:
+        results, failures = check_startup(args.startup_budget)
+        print(json.dumps({'environment': environment(), 'budget_ms': args.startup_budget, 'results': results}, indent=2))
+        for failure in failures:
+            print(failure, file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if not args.skip_rendered and 'DISPLAY' not in os.environ and sys.platform.startswith('linux'):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Render off-screen on display-less machines
+
+    report = run_benchmarks(args.sizes, args.min_time, rendered=not args.skip_rendered)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,148 @@
+"""
+Single-file, memory-mappable checkpoints of a whole evolution run.
+
+Layout of a checkpoint file:
+    8 bytes   magic, b'FLOCKCKP'
+    8 bytes   length of the JSON header, little-endian unsigned
+    header    JSON: generation, seeds, RNG state, history and the dtype, shape and offset of each array
+    arrays    raw C-ordered array data, each starting on a 64-byte boundary
+
+Arrays are read back with np.memmap, so loading a 50k-bird population costs no copy until the
+data is actually touched.
+"""
+import json
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+MAGIC = b'FLOCKCKP'
+VERSION = 1
+ALIGNMENT = 64
+
+
+def align(offset):
+    """Rounds an offset up to the next multiple of ALIGNMENT."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_checkpoint(path, arrays, **state):
+    """
+    Writes a checkpoint atomically: the file is written next to its destination, flushed, then renamed.
+
+    Args:
+        path (str): Destination file.
+        arrays (dict): Array name to ndarray, e.g. 'genomes' and 'fitness'.
+        **state: JSON-serializable values stored in the header (generation, RNG state, history...).
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = align(offset + array.nbytes)
+
+    header = json.dumps({'version': VERSION, 'arrays': layout, **state}).encode()
+    data_start = align(len(MAGIC) + 8 + len(header))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name]['offset'])
+            file.write(memoryview(array).cast('B'))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint, memory-mapping its arrays.
+
+    Args:
+        path (str): Checkpoint file.
+
+    Returns:
+        dict: The header values, plus one read-only np.memmap per stored array.
+    """
+    with open(path, 'rb') as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} is not a checkpoint file')
+        header_length, = struct.unpack('<Q', file.read(8))
+        state = json.loads(file.read(header_length))
+    if state['version'] != VERSION:
+        raise ValueError(f'Unsupported checkpoint version {state["version"]}')
+
+    data_start = align(len(MAGIC) + 8 + header_length)
+    for name, spec in state.pop('arrays').items():
+        shape = tuple(spec['shape'])
+        if np.prod(shape) == 0:
+            state[name] = np.empty(shape, dtype=spec['dtype'])
+        else:
+            state[name] = np.memmap(path, dtype=spec['dtype'], mode='r', offset=data_start + spec['offset'], shape=shape)
+    return state
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints on a background thread so that training never waits on the disk.
+
+    At most one checkpoint is pending: save() blocks only while the previous one is still being
+    written. The arrays handed to save() must not be modified until the write is done.
+    """
+
+    def __init__(self):
+        """Starts the writer thread."""
+        self.queue = queue.Queue(maxsize=1)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Writes queued checkpoints until a None sentinel is received."""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                path, arrays, state = job
+                save_checkpoint(path, arrays, **state)
+            except Exception as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def save(self, path, arrays, **state):
+        """
+        Queues a checkpoint to be written in the background.
+
+        Args:
+            path (str): Destination file.
+            arrays (dict): Array name to ndarray.
+            **state: JSON-serializable header values.
+        """
+        self.raise_error()
+        self.queue.put((path, arrays, state))
+
+    def wait(self):
+        """Blocks until every queued checkpoint has been written."""
+        self.queue.join()
+        self.raise_error()
+
+    def close(self):
+        """Writes the pending checkpoint and stops the thread."""
+        self.queue.put(None)
+        self.thread.join()
+        self.raise_error()
+
+    def raise_error(self):
+        """Re-raises, in the training thread, the error of a failed write."""
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
@@ -0,0 +1,101 @@
+import numpy as np
+
+from utils import WIDTH, GROUND_LEVEL, MIN_GAP, MAX_GAP, PIPE_SPEED, PIPE_SIZE
+
+PIPE_TIP: int = 60       # Minimum distance from pipe ends to the screen top/bottom
+COURSE_LENGTH: int = 64  # Pipes drawn per course, more than a capped run can reach
+
+class Course:
+    """
+    Seeded, precomputed sequence of pipe pairs.
+
+    A pipe pair enters at the right edge of the screen as soon as the previous one has left it
+    on the left, so the position of every pipe at every frame follows from its index. The whole
+    course is drawn up front from the seed, and the frame loop never touches a random generator.
+
+    Attributes:
+        seed (int): Seed the course was drawn from, drawn at random if none was given.
+        gaps (ndarray[int]): Gap between the top and bottom pipe of each pair.
+        tops (ndarray[int]): Bottom y coordinate of the top pipe of each pair.
+        period (int): Frames between two pipe pairs entering the screen.
+        spacing (int): Horizontal distance between two consecutive pipe pairs, in pixels.
+    """
+
+    def __init__(self, seed=None, length=COURSE_LENGTH) -> None:
+        """
+        Draws the gap sizes and positions of the course.
+
+        Args:
+            seed (int, optional): Seed of the course, random if None.
+            length (int): Number of pipe pairs drawn. Longer runs wrap around to the first one.
+        """
+        if seed is None:
+            seed = int(np.random.default_rng().integers(2 ** 32))  # Keep the drawn seed, so the course can be replayed
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.gaps = rng.integers(MIN_GAP, MAX_GAP, length, endpoint=True)
+        self.tops = rng.integers(PIPE_TIP, GROUND_LEVEL - PIPE_TIP - self.gaps, endpoint=True)
+
+        # A pair is replaced on the first frame its right edge is left of the screen
+        self.period = (WIDTH + PIPE_SIZE[0]) // PIPE_SPEED + 1
+        self.spacing = self.period * PIPE_SPEED
+
+    def __len__(self) -> int:
+        """Returns the number of distinct pipe pairs of the course."""
+        return len(self.gaps)
+
+    def pipe(self, index):
+        """
+        Gets the vertical layout of a pipe pair.
+
+        Args:
+            index (int): Index of the pipe pair on the course.
+
+        Returns:
+            tuple: (bottom y of the top pipe, gap size).
+        """
+        index %= len(self)
+        return int(self.tops[index]), int(self.gaps[index])
+
+    def x(self, index, frame):
+        """
+        Gets the left coordinate of a pipe pair at a given frame.
+
+        Args:
+            index (int or ndarray): Index of the pipe pair on the course.
+            frame (int): Number of frames since the start of the course.
+
+        Returns:
+            int or ndarray: Left coordinate of the pipes.
+        """
+        return WIDTH + index * self.spacing - PIPE_SPEED * frame
+
+    def next_pipe(self, x, frame):
+        """
+        Finds the first pipe pair whose right edge is not yet left of x.
+
+        With x = 0 this is the pair on screen, the one birds collide with and see in their state.
+
+        Args:
+            x (int): Horizontal coordinate.
+            frame (int): Number of frames since the start of the course.
+
+        Returns:
+            int: Index of the pipe pair.
+        """
+        behind = x - WIDTH - PIPE_SIZE[0] + PIPE_SPEED * frame
+        return max(0, -(-behind // self.spacing))  # Ceiling division
+
+    def upcoming(self, frame, count):
+        """
+        Gets the queue of pipe pairs starting from the one on screen.
+
+        Args:
+            frame (int): Number of frames since the start of the course.
+            count (int): Number of pipe pairs in the queue.
+
+        Returns:
+            tuple of ndarray: (x, top, gap) of each pipe pair of the queue.
+        """
+        index = np.arange(self.next_pipe(0, frame), self.next_pipe(0, frame) + count)
+        return self.x(index, frame), self.tops[index % len(self)], self.gaps[index % len(self)]
@@ -0,0 +1,255 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+from multiprocessing import shared_memory
+import os
+
+import numpy as np
+
+import utils
+from course import COURSE_LENGTH
+from game import Game
+
+# Everything besides the genome and the course seed that a score depends on
+PHYSICS_CONSTANTS = ('WIDTH', 'HEIGHT', 'GROUND_LEVEL', 'FLAP_SPEED', 'GRAVITY', 'MAX_GRAVITY', 'PIPE_SPEED',
+                     'MIN_GAP', 'MAX_GAP', 'SCORE_CAP', 'BIRD_SIZE', 'PIPE_SIZE')
+
+
+def evaluate_genomes(genomes, seed, decision=(utils.DECISION_INTERVAL, None)):
+    """
+    Runs one headless generation and returns the score of every genome.
+
+    Birds never interact, and alive birds all reach a pipe on the same frame, so the score of a
+    genome only depends on the genome and the course seed, not on the rest of the population.
+
+    Args:
+        genomes (ndarray): Genome matrix of shape (N, N_PARAMS).
+        seed (int): Seed of the course.
+        decision (tuple): Decision interval and change threshold of the birds, see Flock.
+
+    Returns:
+        ndarray: Array of N integer scores.
+    """
+    decision_interval, change_threshold = decision
+    game = Game(headless=True, decision_interval=decision_interval, change_threshold=change_threshold)
+    return GameEvaluator(game).evaluate(genomes, seed)
+
+
+def evaluate_shard(shm_name, shape, start, stop, seed, decision):
+    """
+    Evaluates rows [start, stop) of a genome matrix held in shared memory (runs in a worker process).
+
+    Args:
+        shm_name (str): Name of the shared memory block holding the genome matrix.
+        shape (tuple): Shape of the genome matrix.
+        start (int): First row of the shard.
+        stop (int): End of the shard, exclusive.
+        seed (int): Seed of the course.
+        decision (tuple): Decision interval and change threshold of the birds.
+
+    Returns:
+        ndarray: Scores of the shard's genomes.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        genomes = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        scores = evaluate_genomes(genomes[start:stop], seed, decision)
+        del genomes  # Release every view on the buffer before closing it
+    finally:
+        shm.close()
+    return scores
+
+
+class GameEvaluator:
+    """
+    Evaluates a population in-process, in a single Game (headless or rendered).
+
+    Attributes:
+        game (Game): The game the generations are run in.
+    """
+
+    def __init__(self, game):
+        """Wraps the given game."""
+        self.game = game
+
+    @property
+    def decision(self):
+        """tuple: Decision interval and change threshold of the birds."""
+        return self.game.decision_interval, self.game.change_threshold
+
+    def evaluate(self, genomes, seed):
+        """
+        Runs one generation of the given genomes on the course of the given seed.
+
+        Args:
+            genomes (ndarray): float32 genome matrix of shape (N, N_PARAMS).
+            seed (int): Seed of the course.
+
+        Returns:
+            ndarray: Array of N integer scores.
+        """
+        self.game.reset(genomes, seed)
+        self.game.run_generation()
+        return self.game.flock.score.copy()
+
+    def close(self):
+        """Nothing to release, the game stays open."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParallelEvaluator:
+    """
+    Evaluates a population by sharding it across a pool of worker processes.
+
+    The genome matrix is copied once into a shared memory block, workers read their shard from it
+    without pickling, and only the scores travel back. Every worker runs a headless Game on the
+    same course, so results do not depend on the number of workers.
+
+    Attributes:
+        workers (int): Number of worker processes.
+        decision (tuple): Decision interval and change threshold of the birds, see Flock.
+        pool (ProcessPoolExecutor): The worker pool.
+    """
+
+    def __init__(self, workers=None, decision_interval=utils.DECISION_INTERVAL, change_threshold=None):
+        """
+        Starts the worker pool.
+
+        Args:
+            workers (int, optional): Number of worker processes, one per CPU core by default.
+            decision_interval (int): Frames between two decisions of a bird.
+            change_threshold (float, optional): State change that triggers a decision between intervals.
+        """
+        self.workers = workers or os.cpu_count()
+        self.decision = (decision_interval, change_threshold)
+        self.pool = ProcessPoolExecutor(self.workers)
+        self.shm = None
+
+    def evaluate(self, genomes, seed):
+        """
+        Evaluates every genome on the course of the given seed.
+
+        Args:
+            genomes (ndarray): float32 genome matrix of shape (N, N_PARAMS).
+            seed (int): Seed of the course.
+
+        Returns:
+            ndarray: Array of N integer scores, in population order.
+        """
+        if self.shm is None or self.shm.size < genomes.nbytes:
+            self.release()
+            self.shm = shared_memory.SharedMemory(create=True, size=max(genomes.nbytes, 1))
+        np.ndarray(genomes.shape, dtype=np.float32, buffer=self.shm.buf)[...] = genomes
+
+        bounds = np.linspace(0, len(genomes), min(self.workers, len(genomes)) + 1).astype(int)
+        futures = [self.pool.submit(evaluate_shard, self.shm.name, genomes.shape, start, stop, seed,
+                                   self.decision)
+                   for start, stop in zip(bounds[:-1], bounds[1:])]
+        return np.concatenate([future.result() for future in futures] or [np.zeros(0, dtype=np.int64)])
+
+    def release(self):
+        """Frees the shared memory block."""
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def close(self):
+        """Shuts the worker pool down and frees the shared memory."""
+        self.pool.shutdown()
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def physics_key():
+    """Returns the current values of the physics constants, to tell cached scores of other settings apart."""
+    return tuple(getattr(utils, name) for name in PHYSICS_CONSTANTS) + (COURSE_LENGTH,)
+
+
+class CachedEvaluator:
+    """
+    Wraps an evaluator with a bounded cache of fitness values.
+
+    Scores are deterministic, so a genome already evaluated on a course, or appearing twice in a
+    population, is never simulated again. Entries are keyed by a hash of the genome's bytes, the
+    course seed, the physics constants and the decision settings, and evicted least recently used first.
+
+    Only use it with headless evaluators: cached birds are not simulated, so they are neither drawn
+    nor recorded. Mutation makes most children unique, so it pays off only when populations repeat
+    genomes, e.g. with a low mutation rate; training leaves it off unless asked.
+
+    Attributes:
+        evaluator (GameEvaluator or ParallelEvaluator): The evaluator simulating cache misses.
+        max_size (int): Maximum number of cached fitness values.
+        hits (int): Genomes whose fitness was found in the cache.
+        misses (int): Genomes that had to be simulated.
+    """
+
+    def __init__(self, evaluator, max_size=utils.FITNESS_CACHE_SIZE):
+        """
+        Args:
+            evaluator (GameEvaluator or ParallelEvaluator): The evaluator to wrap.
+            max_size (int): Maximum number of cached fitness values.
+        """
+        self.evaluator = evaluator
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.physics = physics_key()
+        self.hits = self.misses = 0
+
+    def key(self, genome, seed):
+        """Returns the cache key of a genome on the course of a seed, hashing the genome's memory without copying it."""
+        return hashlib.blake2b(memoryview(genome), digest_size=16).digest(), seed, self.physics, self.evaluator.decision
+
+    def evaluate(self, genomes, seed):
+        """
+        Evaluates every genome, simulating only the distinct genomes missing from the cache.
+
+        Args:
+            genomes (ndarray): float32 genome matrix of shape (N, N_PARAMS).
+            seed (int): Seed of the course.
+
+        Returns:
+            ndarray: Array of N integer scores, in population order.
+        """
+        genomes = np.ascontiguousarray(genomes)  # Rows are hashed in place, which needs contiguous memory
+        keys = [self.key(genome, seed) for genome in genomes]
+        scores = np.zeros(len(genomes), dtype=np.int64)
+        missing = {}  # Key to the rows sharing it, for genomes not in the cache
+        for row, key in enumerate(keys):
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                scores[row] = self.cache[key]
+            else:
+                missing.setdefault(key, []).append(row)
+        self.hits += len(genomes) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            first_rows = [rows[0] for rows in missing.values()]
+            for (key, rows), score in zip(missing.items(), self.evaluator.evaluate(genomes[first_rows], seed)):
+                scores[rows] = score
+                self.cache[key] = int(score)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+        return scores
+
+    def close(self):
+        """Closes the wrapped evaluator."""
+        self.evaluator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,225 @@
+"""
+Export of trained networks as compact quantized policies, served with NumPy only.
+
+Weights are stored as int8 (symmetric, one scale per output unit) or float16, biases as float32,
+in an uncompressed .npz file. QuantizedPolicy loads it, dequantizes the weights once into a
+NumpyNet, and decides for a batch of states with its forward pass: neither torch nor pygame is imported.
+
+Usage:
+    python export.py models/model_exit.pth [--dtype int8] [--output models/model_exit.int8.npz] [--seeds 10]
+
+The export prints an accuracy report: the quantized decisions are compared with the float
+model's over states recorded from headless games played by the float model.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from inference import NumpyNet
+
+DTYPES = ('int8', 'float16')
+
+
+def quantize(network, dtype='int8'):
+    """
+    Quantizes the weights of a network.
+
+    Args:
+        network (NumpyNet): The float network.
+        dtype (str): 'int8' or 'float16'.
+
+    Returns:
+        dict: Arrays to save: weight_i, bias_i and, for int8, scale_i for every layer i.
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f'Unsupported dtype {dtype!r}, expected one of {DTYPES}')
+    arrays = {'dtype': np.array(dtype)}
+    for i, (weight, bias) in enumerate(network.layers):
+        if dtype == 'int8':
+            scale = np.abs(weight).max(axis=1) / 127
+            scale[scale == 0] = 1  # All-zero rows quantize to zeros with any scale
+            arrays[f'weight_{i}'] = np.round(weight / scale[:, None]).astype(np.int8)
+            arrays[f'scale_{i}'] = scale.astype(np.float32)
+        else:
+            arrays[f'weight_{i}'] = weight.astype(np.float16)
+        arrays[f'bias_{i}'] = bias.astype(np.float32)
+    return arrays
+
+
+def export(network, filepath, dtype='int8'):
+    """
+    Writes the quantized weights of a network to an .npz file.
+
+    Args:
+        network (NumpyNet): The float network.
+        filepath (str): Destination file.
+        dtype (str): 'int8' or 'float16'.
+    """
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez(filepath, **quantize(network, dtype))
+
+
+class QuantizedPolicy:
+    """
+    Batched decisions of an exported network.
+
+    Attributes:
+        dtype (str): Storage type of the weights, 'int8' or 'float16'.
+        network (NumpyNet): The network with the dequantized float32 weights.
+    """
+
+    def __init__(self, arrays):
+        """
+        Dequantizes exported arrays.
+
+        Args:
+            arrays (Mapping): The arrays written by export().
+        """
+        self.dtype = str(arrays['dtype'])
+        params = {}
+        for i in range(sum(name.startswith('weight_') for name in arrays)):
+            weight = arrays[f'weight_{i}'].astype(np.float32)
+            if self.dtype == 'int8':
+                weight *= arrays[f'scale_{i}'][:, None]
+            params[f'weight_{i}'] = weight
+            params[f'bias_{i}'] = arrays[f'bias_{i}']
+        self.network = NumpyNet(params)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads a policy written by export().
+
+        Args:
+            filepath (str): Path of the file.
+
+        Returns:
+            QuantizedPolicy: The loaded policy.
+        """
+        with np.load(filepath) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def logits(self, states):
+        """
+        Computes the output logits of a batch of states.
+
+        Args:
+            states (ndarray): Array of shape (N, 4), one state per row.
+
+        Returns:
+            ndarray: float32 array of shape (N, 2).
+        """
+        return self.network.logits(states)
+
+    def decide(self, states):
+        """
+        Decides the action of every state of a batch.
+
+        Args:
+            states (ndarray): Array of shape (N, 4), one state per row.
+
+        Returns:
+            ndarray: Array of N actions, 1 to flap.
+        """
+        return self.logits(states).argmax(axis=1)
+
+    def genome(self):
+        """
+        Flattens the dequantized parameters into a genome, e.g. to fly the policy in a Game.
+
+        Returns:
+            ndarray: float32 genome of shape (N_PARAMS,).
+        """
+        return self.network.genome()
+
+
+class RecordingPolicy:
+    """Population policy wrapper keeping a copy of every batch of states it decides for."""
+
+    def __init__(self, policy):
+        """
+        Args:
+            policy (PopulationPolicy): The policy making the decisions.
+        """
+        self.policy = policy
+        self.states = []
+
+    def decide(self, states, index=None):
+        """Records the states and returns the wrapped policy's actions."""
+        self.states.append(np.array(states, dtype=np.float32))
+        return self.policy.decide(states, index)
+
+
+def fly(genome, seeds, record=False):
+    """
+    Plays headless games with one bird.
+
+    Args:
+        genome (ndarray): float32 genome of the bird.
+        seeds (list of int): Seeds of the courses, one game each.
+        record (bool): If True, also return every state the bird decided for.
+
+    Returns:
+        tuple: The score on each course and, with record, an array of shape (M, 4) of states.
+    """
+    from game import Game
+
+    game = Game(headless=True)
+    scores, states = [], []
+    for seed in seeds:
+        game.reset(genome[None], seed)
+        if record:
+            game.policy = RecordingPolicy(game.policy)
+        game.run_generation()
+        scores.append(int(game.flock.score[0]))
+        if record:
+            states.extend(game.policy.states)
+    return scores, (np.concatenate(states) if states else np.zeros((0, 4), dtype=np.float32))
+
+
+def accuracy_report(network, policy, seeds):
+    """
+    Compares the decisions of a quantized policy with those of its float network.
+
+    Args:
+        network (NumpyNet): The float network.
+        policy (QuantizedPolicy): Its quantized export.
+        seeds (list of int): Seeds of the courses the states are recorded on, flown by the float network.
+
+    Returns:
+        dict: Agreement of the decisions, logit error, and the scores of both models on the courses.
+    """
+    float_scores, states = fly(network.genome(), seeds, record=True)
+    quantized_scores, _ = fly(policy.genome(), seeds)
+    reference, quantized = network.logits(states), policy.logits(states)
+    agree = reference.argmax(axis=1) == quantized.argmax(axis=1)
+    return {
+        'dtype': policy.dtype,
+        'states': len(states),
+        'agreement': float(agree.mean()) if len(states) else 1.0,
+        'mismatches': int(np.count_nonzero(~agree)),
+        'max_logit_error': float(np.abs(reference - quantized).max()) if len(states) else 0.0,
+        'float_scores': float_scores,
+        'quantized_scores': quantized_scores,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export a trained network as a quantized NumPy policy.')
+    parser.add_argument('model', help='.pth file saved by the training, or .npz saved by NumpyNet')
+    parser.add_argument('--dtype', choices=DTYPES, default='int8', help='storage type of the weights')
+    parser.add_argument('--output', help='destination file, next to the model by default')
+    parser.add_argument('--seeds', type=int, default=10, help='courses the accuracy report records states on')
+    args = parser.parse_args()
+
+    network = NumpyNet.load(args.model)
+    output = args.output or f'{os.path.splitext(args.model)[0]}.{args.dtype}.npz'
+    export(network, output, args.dtype)
+    report = accuracy_report(network, QuantizedPolicy.load(output), list(range(args.seeds)))
+    report['file_bytes'] = os.path.getsize(output)
+    report['float32_bytes'] = int(sum(value.nbytes for value in network.params.values()))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,239 @@
+import numpy as np
+
+from utils import WIDTH, HEIGHT, FLAP_SPEED, GRAVITY, MAX_GRAVITY, GROUND_LEVEL, PIPE_SPEED, BIRD_SIZE, DEATH_ANIMATION_FRAMES
+
+
+def to_pixels(values):
+    """
+    Converts float positions to integer pixels the way pygame.Rect does on assignment.
+
+    Args:
+        values (ndarray): Float positions.
+
+    Returns:
+        ndarray: Positions rounded half away from zero, as int64.
+    """
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+class Flock:
+    """
+    Struct-of-arrays state for a whole population of birds.
+
+    Every bird shares the same sprite size, so its rect is fully described by its top-left
+    corner. The rules are the ones of the original per-bird simulation: gravity, flaps,
+    boundaries, pipe collisions and scoring, applied with a few array operations.
+
+    Only the live birds are stepped: their indices are kept in the live array, which shrinks as
+    birds die, so late in a generation a frame costs as little as the few survivors. When deaths
+    are animated, dead birds keep falling for DEATH_ANIMATION_FRAMES frames from the dying array.
+
+    Physics step every frame, but the policy can be asked less often: every decision_interval
+    frames, and in between only for the birds whose state moved by more than change_threshold
+    (in any component) since their last decision. The other birds repeat their last action.
+
+    Attributes:
+        size (int): Number of birds in the flock.
+        animate_deaths (bool): If True, dead birds keep moving during their death animation.
+        decision_interval (int): Frames between two decisions of every live bird, 1 to decide every frame.
+        change_threshold (float): State change that triggers a decision between intervals, None to disable.
+        frame (int): Number of updates since the last reset.
+        x (ndarray[int]): Left coordinate of each bird's rect.
+        y (ndarray[int]): Top coordinate of each bird's rect.
+        velocity (ndarray[float]): Vertical velocity of each bird in pixels per frame.
+        is_alive (ndarray[bool]): Status of each bird, alive or not.
+        score (ndarray[int]): The score each bird has achieved.
+        passed (ndarray[bool]): Flag to indicate if each bird has passed the current pipe.
+        death_counter (ndarray[int]): Frames each bird has been dead (for animation purposes).
+        live (ndarray[int]): Indices of the live birds, in increasing order.
+        dying (ndarray[int]): Indices of the dead birds whose death animation is running.
+        action (ndarray[int]): Last action of each bird, repeated until its next decision.
+        decided_state (ndarray[float]): State of each bird at its last decision, when change_threshold is set.
+    """
+
+    def __init__(self, size, animate_deaths=False, decision_interval=1, change_threshold=None) -> None:
+        """Initializes the arrays for a flock of the given size."""
+        if decision_interval < 1:
+            raise ValueError(f'decision_interval must be at least 1, got {decision_interval}')
+        self.size = size
+        self.animate_deaths = animate_deaths
+        self.decision_interval = decision_interval
+        self.change_threshold = change_threshold
+        self.width, self.height = BIRD_SIZE
+        self.reset()
+
+    def reset(self) -> None:
+        """Puts every bird back at the starting position, alive and with a score of zero."""
+        self.x = np.full(self.size, WIDTH // 3 - self.width // 2, dtype=np.int64)
+        self.y = np.full(self.size, HEIGHT // 2 - self.height // 2, dtype=np.int64)
+        self.velocity = np.zeros(self.size, dtype=np.float64)
+        self.is_alive = np.ones(self.size, dtype=bool)
+        self.score = np.zeros(self.size, dtype=np.int64)
+        self.passed = np.zeros(self.size, dtype=bool)
+        self.death_counter = np.zeros(self.size, dtype=np.int64)
+        self.live = np.arange(self.size)
+        self.dying = np.zeros(0, dtype=np.int64)
+        self.frame = 0
+        self.action = np.zeros(self.size, dtype=np.int64)
+        self.decided_state = np.zeros((self.size, 4), dtype=np.float64)
+
+    def in_flight(self) -> bool:
+        """Checks whether any bird is still alive or playing its death animation."""
+        return len(self.live) > 0 or len(self.dying) > 0
+
+    def kill(self, index) -> None:
+        """
+        Marks birds as dead and starts their death animation.
+
+        Args:
+            index (ndarray): Indices of the birds, all of them live.
+        """
+        self.is_alive[index] = False
+        if self.animate_deaths:
+            self.dying = np.concatenate([self.dying, index])
+
+    def update(self, decide=None, up_pipe=None, down_pipe=None):
+        """
+        Steps gravity, flaps, movement and boundary checks for the live birds, and the dying ones.
+
+        Args:
+            decide (callable, optional): Called as decide(states, indices) for the live birds,
+                returns one action per bird (1 to flap).
+            up_pipe (Rect, optional): Rect of the top pipe.
+            down_pipe (Rect, optional): Rect of the bottom pipe.
+
+        Returns:
+            ndarray: Indices of the birds that flapped this frame.
+        """
+        if len(self.dying):
+            self.update_dying()
+
+        live = self.live
+        velocity = np.minimum(self.velocity[live] + GRAVITY, MAX_GRAVITY)
+
+        flapped = np.zeros(0, dtype=np.int64)
+        if decide is not None and up_pipe and down_pipe and len(live):
+            self.velocity[live] = velocity  # The state holds the velocity after gravity
+            flaps = self.decide(decide, self.get_states(up_pipe, down_pipe, live), live) == 1
+            flapped = live[flaps]
+            velocity[flaps] = FLAP_SPEED
+        self.velocity[live] = velocity
+        self.frame += 1
+
+        y = to_pixels(self.y[live] + velocity)
+        self.y[live] = y
+
+        # Check boundaries: birds hitting the top of the screen or the ground die
+        inside = (y > 0) & (y + self.height < GROUND_LEVEL)
+        if not inside.all():
+            fallen = live[~inside]
+            self.kill(fallen)
+            self.death_counter[fallen] += 1
+            self.live = live[inside]
+        return flapped
+
+    def decide(self, decide, states, live):
+        """
+        Gets the action of every live bird, asking the policy only for the birds due for a decision.
+
+        Args:
+            decide (callable): The policy, called as decide(states, indices).
+            states (ndarray): States of the live birds.
+            live (ndarray): Indices of the live birds.
+
+        Returns:
+            ndarray: One action per live bird, 1 to flap.
+        """
+        if self.decision_interval == 1:
+            return np.asarray(decide(states, live))
+        if self.frame % self.decision_interval == 0:
+            due = np.ones(len(live), dtype=bool)
+        elif self.change_threshold is not None:
+            due = (np.abs(states - self.decided_state[live]) > self.change_threshold).any(axis=1)
+        else:
+            return self.action[live]
+
+        if due.any():
+            asked = live[due]
+            self.action[asked] = decide(states[due], asked)
+            if self.change_threshold is not None:
+                self.decided_state[asked] = states[due]
+        return self.action[live]
+
+    def update_dying(self) -> None:
+        """Moves the dead birds left and down until their death animation is over."""
+        dying = self.dying
+        velocity = np.minimum(self.velocity[dying] + GRAVITY, MAX_GRAVITY)
+        self.velocity[dying] = velocity
+        self.x[dying] -= 2 * PIPE_SPEED  # Move birds left when dead to simulate collision
+        self.y[dying] = to_pixels(self.y[dying] + velocity)
+        self.death_counter[dying] += 1
+        self.dying = dying[self.death_counter[dying] < DEATH_ANIMATION_FRAMES]
+
+    def handle_collisions(self, up_pipe, down_pipe):
+        """
+        Kills the live birds that hit a pipe and scores the ones that passed it.
+
+        Args:
+            up_pipe (Rect): Rect of the top pipe.
+            down_pipe (Rect): Rect of the bottom pipe.
+
+        Returns:
+            ndarray: Indices of the birds that scored this frame.
+        """
+        live = self.live
+        x, y = self.x[live], self.y[live]
+        hit = self.overlaps(up_pipe, x, y) | self.overlaps(down_pipe, x, y)
+
+        passed = self.passed[live]
+        scores = ~hit & ~passed & (down_pipe.right < x)
+        scored = live[scores]
+        self.score[scored] += 1
+
+        # Reset pipe pass status once the pipe has been moved back to the right
+        self.passed[live] = (passed | scores) & ~(down_pipe.right > x)
+
+        if hit.any():
+            self.kill(live[hit])
+            self.live = live[~hit]
+        return scored
+
+    def overlaps(self, rect, x, y):
+        """
+        Tests bird rects against a pipe rect, like pygame.Rect.colliderect.
+
+        Args:
+            rect (Rect): The rect to test against.
+            x (ndarray): Left coordinate of the birds.
+            y (ndarray): Top coordinate of the birds.
+
+        Returns:
+            ndarray[bool]: True for the birds overlapping the rect.
+        """
+        return ((x < rect.right) & (x + self.width > rect.left)
+                & (y < rect.bottom) & (y + self.height > rect.top))
+
+    def get_states(self, up_pipe, down_pipe, index=None):
+        """
+        Calculates the state vectors used as input to the neural networks.
+
+        See Bird.get_state for the meaning of each component.
+
+        Args:
+            up_pipe (Rect): Rect of the top pipe.
+            down_pipe (Rect): Rect of the bottom pipe.
+            index (ndarray, optional): Indices of the birds to compute states for, all by default.
+
+        Returns:
+            ndarray: Array of shape (len(index), 4) with one state per row.
+        """
+        if index is None:
+            index = slice(None)
+        centerx = self.x[index] + self.width // 2
+        centery = self.y[index] + self.height // 2
+        return np.stack([
+            (up_pipe.x - centerx) / WIDTH,
+            (down_pipe.top - centery) / HEIGHT,
+            (centery - up_pipe.bottom) / HEIGHT,
+            self.velocity[index] / MAX_GRAVITY
+        ], axis=1)
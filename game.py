@@ -1,93 +1,262 @@
-import pygame as pg
-from pygame.locals import *
 import sys
+import time
+import numpy as np
 
 
-from utils import *
+from utils import WIDTH, HEIGHT, SCALE, FPS, GROUND_LEVEL, SCORE_CAP, DECISION_INTERVAL
 from gui import GUI
-from bird import Bird
+from flock import Flock
+from genome import N_PARAMS
 from pipe import PipePair
+from policy import PopulationPolicy
+from profiler import NULL_PROFILER
+from replay import Replay, ReplayPolicy
 
 
 class Game:
-    def __init__(self, population=None):
-        """Initializes the game with an optional population of birds."""
+    def __init__(self, population=None, headless=False, seed=None, profiler=None, record=False, render_every=1,
+                 display_fps=None, decision_interval=DECISION_INTERVAL, change_threshold=None):
+        """
+        Initializes the game with an optional population of genomes.
+
+        An optional Profiler times each phase of the frame loop; by default nothing is recorded.
+        With record, the flaps of every bird are recorded so that generations can be replayed.
+
+        The seed fixes the sequence of pipes, so that two games with the same seed see the same course.
+
+        In headless mode no window is opened, no images are loaded and pygame is never imported:
+        generations only run the physics and collision checks, as fast as the CPU allows.
+
+        In rendered mode a frame is drawn every render_every simulation steps, at most FPS times per
+        second. With display_fps (spectator mode) the simulation runs uncapped instead, and a frame is
+        drawn whenever 1 / display_fps seconds have passed, so training can be watched at full speed.
+
+        The networks decide every decision_interval frames, or earlier for the birds whose state changed
+        by more than change_threshold; in between, birds repeat their last action (see Flock).
+        """
+        if render_every < 1:
+            raise ValueError(f'render_every must be at least 1, got {render_every}')
+        self.headless = headless
+        self.profiler = profiler or NULL_PROFILER
+        self.record = record
+        self.recording = []
+        self.render_every = render_every
+        self.display_fps = display_fps
+        self.decision_interval = decision_interval
+        self.change_threshold = change_threshold
+        self.last_render = 0
+        self.ground_x = 0
+        if not headless:
+            self.open_window()
+
+        # Game state
+        self.gameover = False
+        self.death_counter = 0
+        self.pipe = PipePair(headless=headless, seed=seed)
+        self.gui = GUI(headless=headless)
+        self.reset(population, seed)
+
+    def open_window(self):
+        """Initializes pygame, opens the window and loads the images of the rendered mode."""
+        import pygame as pg
+        from assets import load_image, rotated_bird_sprites
+
         pg.init()
         pg.display.set_caption('Flocky Bird')
         self.display = pg.display.set_mode([SCALE * WIDTH, SCALE * HEIGHT])
         self.clock = pg.time.Clock()
+        self.fps = 0 if self.display_fps else FPS  # Frame cap of the rendered mode, 0 for uncapped
         self.overlay_display = pg.Surface((WIDTH, HEIGHT))
+        self.dirty_rects = []  # Areas of the overlay drawn at the previous frame
+        self.full_redraw = True
 
         # Load images
-        self.background_image = pg.image.load('sprites/background-day.png').convert_alpha()
-        self.ground_image = pg.image.load('sprites/base.png').convert_alpha()
-        self.ground_x = 0
-
-        # Game state
-        self.gameover = False
-        self.death_counter = 0
-        self.birds = population or []
-        self.pipe = PipePair()
-        self.gui = GUI()
+        self.background_image = load_image('sprites/background-day.png')
+        self.ground_image = load_image('sprites/base.png')
+        rotated_bird_sprites()  # Pre-render the rotated bird sprites once, before the first frame
 
     def handle_collisions(self):
-        """Checks and handles collisions between birds and pipes."""
-        collision_results = {}
-        for bird in self.birds:
-            if self.pipe.pipe_bottom_rect.colliderect(bird.rect) or self.pipe.pipe_top_rect.colliderect(bird.rect):
-                bird.is_alive = False
-                collision_results[bird] = Collision.PIPE
-            elif not bird.passed and self.pipe.pipe_bottom_rect.right < bird.rect.left:
-                bird.score += 1
-                self.gui.set_score(bird.score)
-                bird.passed = True
-                collision_results[bird] = Collision.SCORE
-            else:
-                collision_results[bird] = Collision.NONE
-
-            # Reset pipe pass status if all birds have passed or are dead
-            if bird.passed and self.pipe.pipe_bottom_rect.right > bird.rect.left:
-                bird.passed = False
-
-        return collision_results
+        """
+        Checks and handles collisions between birds and pipes.
+
+        Returns:
+            ndarray: Indices of the birds that scored this frame.
+        """
+        scored = self.flock.handle_collisions(self.pipe.pipe_top_rect, self.pipe.pipe_bottom_rect)
+        if len(scored):
+            self.gui.set_score(self.flock.score[scored[-1]])
+            # Only birds that just scored can pass the cap, so the loop condition needs no scan of the flock
+            self.capped |= bool(self.flock.score[scored].max() > SCORE_CAP)
+        return scored
+
+    def is_running(self):
+        """Checks whether the current generation is still in progress."""
+        if self.capped:
+            return False
+        if self.headless:
+            # Nothing is drawn, so the generation ends as soon as the last bird dies
+            return len(self.flock.live) > 0
+        return self.flock.in_flight()
+
+    def handle_events(self):
+        """Quits the game when the window is closed or escape is pressed."""
+        import pygame as pg
+        from pygame.locals import QUIT, KEYDOWN, K_ESCAPE
+
+        for event in pg.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                pg.quit()
+                sys.exit()
+
+    def timed_decide(self, states, index):
+        """Runs the policy, charging the physics before it and the inference to the profiler."""
+        self.profiler.lap('physics')
+        actions = self.policy.decide(states, index)
+        self.profiler.lap('predict')
+        return actions
+
+    def update(self):
+        """Advances the birds, the pipes and the collisions by one frame."""
+        decide = None
+        if self.policy:
+            decide = self.timed_decide if self.profiler.enabled else self.policy.decide
+        flapped = self.flock.update(decide, up_pipe=self.pipe.pipe_top_rect, down_pipe=self.pipe.pipe_bottom_rect)
+        self.profiler.lap('physics')
+        if self.record:
+            flaps = np.zeros(self.flock.size, dtype=bool)
+            flaps[flapped] = True
+            self.recording.append(np.packbits(flaps))
+
+        self.pipe.update()
+        self.handle_collisions()
+        self.profiler.lap('collisions')
+
+    def should_render(self):
+        """Checks whether a frame is due, every render_every steps or every 1 / display_fps seconds."""
+        if self.display_fps:
+            now = time.perf_counter()
+            if now - self.last_render < 1 / self.display_fps:
+                return False
+            self.last_render = now
+            return True
+        return self.pipe.frame % self.render_every == 0
+
+    def visible_birds(self):
+        """Returns the indices of the live birds and of the dying birds still on screen, in order."""
+        index = np.concatenate([self.flock.live, self.flock.dying])
+        x = self.flock.x[index]
+        return np.sort(index[(x < WIDTH) & (x + self.flock.width > 0)])
+
+    def scale_rect(self, rect):
+        """Converts an area of the overlay to the area of the window it is scaled to."""
+        import pygame as pg
+
+        return pg.Rect(int(rect.x * SCALE) - 1, int(rect.y * SCALE) - 1,
+                       int(rect.width * SCALE) + 3, int(rect.height * SCALE) + 3).clip(self.display.get_rect())
+
+    def render(self):
+        """
+        Draws the current frame to the window and waits for the next tick.
+
+        Only the areas drawn at the previous frame are erased, and only them and the areas drawn at
+        this frame are sent to the screen. Scaling writes into the window surface, so drawing a frame
+        allocates no Surface.
+        """
+        import pygame as pg
+
+        overlay = self.overlay_display
+        if self.full_redraw:
+            overlay.blit(self.background_image, (0, 0))
+        else:
+            for rect in self.dirty_rects:
+                overlay.blit(self.background_image, rect, rect)  # Erase what the previous frame drew
+
+        drawn = [self.birds[index].render(overlay) for index in self.visible_birds()]
+        self.profiler.lap('render_birds')
+
+        drawn.extend(self.pipe.render(overlay))
+        self.ground_x = -(2 * self.pipe.frame % WIDTH)  # The ground scrolls with the simulation, not with the draws
+        drawn.append(overlay.blit(self.ground_image, (self.ground_x, GROUND_LEVEL)))
+        drawn.append(overlay.blit(self.ground_image, (self.ground_x + WIDTH, GROUND_LEVEL)))
+
+        drawn.extend(self.gui.render(overlay))
+        self.profiler.lap('render_scene')
+        pg.transform.scale(overlay, self.display.get_size(), self.display)
+        self.profiler.lap('scale')
+        if self.full_redraw:
+            pg.display.update()
+            self.full_redraw = False
+        else:
+            pg.display.update([self.scale_rect(rect) for rect in self.dirty_rects + drawn])
+        self.dirty_rects = drawn
+        self.profiler.lap('display')
+        self.clock.tick(self.fps)
+        self.profiler.lap('tick')
 
     def run_generation(self):
         """Runs the game simulation for one generation."""
-        while any(bird.death_counter < 50 for bird in self.birds) and all(bird.score <= SCORE_CAP for bird in self.birds if bird.is_alive):
-            self.overlay_display.fill(BG_COLOR)
-            self.overlay_display.blit(self.background_image, (0, 0))
-
-            for event in pg.event.get():
-                if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                    pg.quit()
-                    sys.exit()
-
-            for bird in self.birds:
-                bird.render(self.overlay_display)
-                bird.update(action=None, up_pipe=self.pipe.pipe_top_rect, down_pipe=self.pipe.pipe_bottom_rect)
-                if not bird.is_alive:
-                    bird.death_counter += 1
-            
-            self.pipe.update()
-            self.handle_collisions()
-            
-            self.pipe.render(self.overlay_display)
-            self.overlay_display.blit(self.ground_image, (self.ground_x, GROUND_LEVEL))
-            self.overlay_display.blit(self.ground_image, (self.ground_x + WIDTH, GROUND_LEVEL))
-            
-            self.ground_x = (self.ground_x - 2) % -WIDTH
-
-            self.gui.render(self.overlay_display)
-            self.display.blit(pg.transform.scale(self.overlay_display, (SCALE * WIDTH, SCALE * HEIGHT)), (0, 0))
-            pg.display.update()
-            self.clock.tick(FPS)
+        self.profiler.start()
+        while self.is_running():
+            self.profiler.lap('loop')
+            self.update()
+
+            if not self.headless and self.should_render():
+                self.handle_events()
+                self.profiler.lap('events')
+                self.render()
 
-    def reset(self, population=None):
-        """Resets the game to a fresh state with a new population of birds."""
-        self.pipe.reset()
+    def reset(self, population=None, seed=None):
+        """Resets the game to a fresh state with a new population of genomes and a course seed."""
+        self.pipe.restart(seed)
         self.gui.reset()
-        self.birds = population or []
+        self.full_redraw = True
+        self.set_population(population if population is not None else np.empty((0, N_PARAMS), dtype=np.float32))
 
     def set_population(self, population):
-        """Sets the population of birds for the game."""
-        self.birds = population
+        """
+        Sets the population for the game.
+
+        Args:
+            population (ndarray): float32 genome matrix of shape (N, N_PARAMS), one row per bird.
+        """
+        self.genomes = population
+        self.policy = PopulationPolicy(population) if len(population) else None
+        self.new_flock(len(population))
+
+    def new_flock(self, size, decision_interval=None):
+        """Starts a new flock of the given size and, when rendering, the bird views on it."""
+        # Dead birds only need to keep falling when someone watches them
+        self.flock = Flock(size, animate_deaths=not self.headless,
+                           decision_interval=self.decision_interval if decision_interval is None else decision_interval,
+                           change_threshold=self.change_threshold if decision_interval is None else None)
+        self.capped = False
+        self.recording = []
+        # Birds are only views on the flock, needed for rendering
+        self.birds = []
+        if not self.headless:
+            from bird import Bird
+
+            self.birds = [Bird(self.flock, index) for index in range(size)]
+
+    def replay(self):
+        """
+        Returns the recording of the current generation.
+
+        Returns:
+            Replay: Course seed and per-frame flaps of every bird, if the game was created with record.
+        """
+        flaps = np.array(self.recording, dtype=np.uint8).reshape(len(self.recording), (self.flock.size + 7) // 8)
+        return Replay(self.pipe.course.seed, self.flock.size, flaps)
+
+    def load_replay(self, replay):
+        """
+        Sets up the game to play a replay back: its course, and its recorded flaps instead of neural networks.
+
+        Args:
+            replay (Replay): The recording to play back.
+        """
+        self.pipe.restart(replay.seed)
+        self.gui.reset()
+        self.genomes = None
+        self.policy = ReplayPolicy(replay, self.pipe)
+        self.new_flock(replay.size, decision_interval=1)  # Replays hold the flaps of every frame
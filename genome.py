@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Units per layer of NeuralNet's default architecture: input, three hidden layers, output
+LAYER_SIZES = (4, 64, 64, 64, 2)
+
+# Name and shape of each parameter, in NeuralNet.state_dict() order
+PARAM_SHAPES = []
+for i, (fan_in, fan_out) in enumerate(zip(LAYER_SIZES[:-1], LAYER_SIZES[1:])):
+    PARAM_SHAPES.append((f'net.{2 * i}.weight', (fan_out, fan_in)))
+    PARAM_SHAPES.append((f'net.{2 * i}.bias', (fan_out,)))
+
+N_PARAMS = sum(int(np.prod(shape)) for _, shape in PARAM_SHAPES)
+
+
+def param_views(genomes):
+    """
+    Splits flattened genomes into per-parameter views, without copying.
+
+    Args:
+        genomes (ndarray): One genome of shape (N_PARAMS,) or a matrix of shape (N, N_PARAMS).
+
+    Returns:
+        OrderedDict: Parameter name to view, shaped like the parameter (with a leading N axis for matrices).
+    """
+    leading = genomes.shape[:-1]
+    views = OrderedDict()
+    offset = 0
+    for name, shape in PARAM_SHAPES:
+        size = int(np.prod(shape))
+        views[name] = genomes[..., offset:offset + size].reshape(leading + shape)
+        offset += size
+    return views
+
+
+def layer_views(genomes):
+    """
+    Returns the (weight, bias) views of each linear layer of flattened genomes.
+
+    Args:
+        genomes (ndarray): One genome or a matrix of genomes.
+
+    Returns:
+        list of tuple: One (weight, bias) pair of views per layer.
+    """
+    views = list(param_views(genomes).values())
+    return list(zip(views[0::2], views[1::2]))
+
+
+def random_genomes(size, rng):
+    """
+    Draws genomes with the same distribution as PyTorch's default nn.Linear initialisation.
+
+    Args:
+        size (int): Number of genomes.
+        rng (numpy.random.Generator): Random number generator.
+
+    Returns:
+        ndarray: float32 matrix of shape (size, N_PARAMS).
+    """
+    genomes = np.empty((size, N_PARAMS), dtype=np.float32)
+    for weight, bias in layer_views(genomes):
+        bound = 1 / np.sqrt(weight.shape[-1])  # 1 / sqrt(fan_in)
+        weight[...] = rng.uniform(-bound, bound, weight.shape)
+        bias[...] = rng.uniform(-bound, bound, bias.shape)
+    return genomes
+
+
+def to_network(genome):
+    """
+    Builds a NeuralNet whose parameters are views on a flattened genome.
+
+    Args:
+        genome (ndarray): float32 genome of shape (N_PARAMS,).
+
+    Returns:
+        NeuralNet: Network sharing its memory with the genome.
+    """
+    import torch
+    from network import NeuralNet
+
+    network = NeuralNet()
+    for param, view in zip(network.parameters(), param_views(genome).values()):
+        param.data = torch.from_numpy(view)
+    return network
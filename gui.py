@@ -1,20 +1,18 @@
-import pygame as pg
-from utils import *
+from utils import WIDTH
 
 class GUI:
     """Handles the graphical user interface for displaying scores in the game."""
     
-    def __init__(self):
+    def __init__(self, headless=False):
         """Initializes the GUI components including loading number sprites for displaying scores."""
         self.reset()
-        self.num_sprite_dict = self.load_number_sprites()
+        self.num_sprite_dict = {} if headless else self.load_number_sprites()
 
     def load_number_sprites(self):
-        """Loads number sprites from files and returns a dictionary mapping digits to their corresponding sprites."""
-        num_sprite_dict = {}
-        for num in range(10):
-            num_sprite_dict[str(num)] = pg.image.load(f'sprites/{num}.png').convert_alpha()
-        return num_sprite_dict
+        """Returns the shared dictionary mapping digits to their corresponding sprites."""
+        from assets import number_sprites
+
+        return number_sprites()
 
     def increment_score(self):
         """Increments the current score by one."""
@@ -29,13 +27,24 @@ class GUI:
         self.highscore = max(self.highscore, highscore)
 
     def render(self, display):
-        """Renders the current score at a fixed position on the display."""
-        score_digits = [int(d) for d in str(self.score)[::-1]]
-        for i, digit in enumerate(score_digits):
-            display.blit(self.num_sprite_dict[str(digit)], (WIDTH // 2 - 24 * (i), 36))
+        """
+        Renders the current score at a fixed position on the display.
+
+        The digit sprites and positions are only rebuilt when the score changes.
+
+        Returns:
+            list of Rect: The areas drawn.
+        """
+        if self.rendered_score != self.score:
+            self.score_blits = [(self.num_sprite_dict[digit], (WIDTH // 2 - 24 * i, 36))
+                                for i, digit in enumerate(str(self.score)[::-1])]
+            self.rendered_score = self.score
+        return display.blits(self.score_blits)
 
     def reset(self):
         """Resets the score to zero."""
         self.score = 0
         self.highscore = 0
-        
\ No newline at end of file
+        self.rendered_score = None
+        self.score_blits = []
+        
@@ -0,0 +1,143 @@
+"""
+NeuralNet inference in plain NumPy, without importing torch.
+
+The network is a small MLP, so a forward pass is a handful of float32 matrix products: running
+them in NumPy avoids torch's import time, memory footprint and per-call dispatch overhead.
+Weights are read from a NeuralNet state_dict, a .pth file saved by NeuralNet.save (this one
+needs torch to unpickle), a .npz file saved by NumpyNet.save, or a flattened genome.
+
+Usage:
+    net = NumpyNet.load('models/model_exit.pth')
+    action = net.predict(state)
+    actions = net.predict_batch(states)
+"""
+import inspect
+
+import numpy as np
+
+from genome import param_views
+
+
+def to_array(value):
+    """Converts a tensor or array-like to a float32 ndarray."""
+    if hasattr(value, 'detach'):
+        value = value.detach().cpu().numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
+class NumpyNet:
+    """
+    Float32 forward pass of a NeuralNet: linear layers with ReLU in between.
+
+    The argmax is taken on the logits, like NeuralNet.predict: the final softmax does not change it.
+
+    Attributes:
+        params (dict): Parameter name to float32 array, in state_dict order.
+        layers (list of tuple): (weight, bias) of each linear layer, weight shaped (out, in).
+    """
+
+    def __init__(self, params):
+        """
+        Wraps the parameters of a network.
+
+        Args:
+            params (dict): Parameter name to tensor or array, e.g. NeuralNet.state_dict().
+        """
+        self.params = {name: to_array(value) for name, value in params.items()}
+        values = list(self.params.values())
+        self.layers = list(zip(values[0::2], values[1::2]))
+        for (weight, bias), (next_weight, _) in zip(self.layers, self.layers[1:] + [(None, None)]):
+            if weight.ndim != 2 or bias.shape != weight.shape[:1] or (next_weight is not None and next_weight.shape[1] != weight.shape[0]):
+                raise ValueError('Parameters must be (weight, bias) pairs of consecutive linear layers')
+
+    @classmethod
+    def from_genome(cls, genome):
+        """
+        Builds a network whose parameters are views on a flattened genome.
+
+        Args:
+            genome (ndarray): float32 genome of shape (N_PARAMS,).
+
+        Returns:
+            NumpyNet: Network sharing its memory with the genome.
+        """
+        return cls(param_views(genome))
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads a network saved with NumpyNet.save (.npz) or NeuralNet.save (.pth, imports torch).
+
+        Args:
+            filepath (str): Path of the file.
+
+        Returns:
+            NumpyNet: The loaded network.
+        """
+        if filepath.endswith('.npz'):
+            with np.load(filepath) as data:
+                return cls({name: data[name] for name in data.files})
+        import torch
+
+        # weights_only refuses arbitrary pickles, but torch.load only accepts it since torch 1.13
+        safe = {'weights_only': True} if 'weights_only' in inspect.signature(torch.load).parameters else {}
+        return cls(torch.load(filepath, map_location='cpu', **safe))
+
+    def save(self, filepath):
+        """
+        Saves the parameters to a .npz file, readable without torch.
+
+        Args:
+            filepath (str): Path to save the file.
+        """
+        np.savez(filepath, **self.params)
+
+    def genome(self):
+        """
+        Flattens the parameters into a genome, e.g. to play a saved model back in a Game.
+
+        Returns:
+            ndarray: float32 genome of shape (N_PARAMS,).
+        """
+        return np.concatenate([value.ravel() for value in self.params.values()])
+
+    def logits(self, states):
+        """
+        Computes the output logits of a batch of states.
+
+        Args:
+            states (ndarray): Array of shape (M, 4), one state per row.
+
+        Returns:
+            ndarray: float32 array of shape (M, 2).
+        """
+        x = np.asarray(states, dtype=np.float32)
+        for i, (weight, bias) in enumerate(self.layers):
+            x = x @ weight.T + bias
+            if i < len(self.layers) - 1:
+                np.maximum(x, 0, out=x)
+        return x
+
+    def predict_batch(self, states):
+        """
+        Predicts the action of every state of a batch.
+
+        Args:
+            states (ndarray): Array of shape (M, 4), one state per row.
+
+        Returns:
+            ndarray: Array of M actions, 1 to flap.
+        """
+        return self.logits(states).argmax(axis=1)
+
+    def predict(self, state):
+        """
+        Predicts the action of a single state.
+
+        Args:
+            state (list or array): The state representation from the environment.
+
+        Returns:
+            int: The index of the action with the highest logit.
+        """
+        return int(self.logits(np.reshape(state, (1, -1)))[0].argmax())
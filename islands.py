@@ -0,0 +1,190 @@
+"""
+Island-model evolution: sub-populations evolve in parallel processes and exchange their best genomes.
+
+Each island is a separate process running the usual evaluate, selection, crossover and mutate loop
+on its share of the population. Every MIGRATION_INTERVAL generations each island sends copies of
+its MIGRANTS best genomes to one neighbour, where they replace the worst ones before breeding.
+Neighbours form a ring, either fixed or reshuffled at every migration (random topology).
+
+Islands only synchronise when they migrate, and only with their neighbour. Every island flies the
+same course and draws from its own seeded RNG, so a run is reproducible for a given seed.
+"""
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from utils import NUMBER_GENERATION, POPULATION_SIZE, MIGRATION_INTERVAL, MIGRANTS, METRICS_PATH, DECISION_INTERVAL
+from game import Game
+from evaluation import GameEvaluator
+from genome import random_genomes, to_network
+from metrics import MetricsWriter, generation_metrics
+from training import evaluate_fitness, reproduce
+
+TOPOLOGIES = ('ring', 'random')
+
+
+def migration_target(index, islands, migration, topology, seed):
+    """
+    Gets the island an island sends its migrants to.
+
+    Args:
+        index (int): Index of the sending island.
+        islands (int): Number of islands.
+        migration (int): Number of the migration, to reshuffle the random topology.
+        topology (str): 'ring' for a fixed ring, 'random' for a new random ring at every migration.
+        seed (int): Seed of the random topology, the same on every island.
+
+    Returns:
+        int: Index of the receiving island.
+    """
+    if topology == 'ring':
+        return (index + 1) % islands
+    order = np.random.default_rng([seed, migration]).permutation(islands)
+    position = int(np.flatnonzero(order == index)[0])
+    return int(order[(position + 1) % islands])
+
+
+def migrate(genomes, fitness, migrants, outbox, inbox):
+    """
+    Sends copies of the best genomes to a neighbour and replaces the worst ones with its migrants.
+
+    Every island sends and receives exactly one batch per migration, so this blocks until the
+    neighbour has reached the same generation.
+
+    Args:
+        genomes (ndarray): Genome matrix of the island, modified in place.
+        fitness (ndarray): Fitness of each genome, modified in place.
+        migrants (int): Number of genomes sent and received.
+        outbox (Queue): Inbox of the receiving island.
+        inbox (Queue): Inbox of this island.
+    """
+    best = np.argsort(-fitness, kind='stable')[:migrants]
+    outbox.put((genomes[best], fitness[best]))
+    incoming_genomes, incoming_fitness = inbox.get()
+    worst = np.argsort(fitness, kind='stable')[:migrants]
+    genomes[worst] = incoming_genomes
+    fitness[worst] = incoming_fitness
+
+
+def evolve_island(index, size, seed_sequence, course_seed, generations, interval, migrants, topology, inboxes, results,
+                  decision=(DECISION_INTERVAL, None)):
+    """
+    Evolves one island (runs in its own process).
+
+    Args:
+        index (int): Index of the island.
+        size (int): Number of genomes on the island.
+        seed_sequence (SeedSequence): Seed of the island's RNG.
+        course_seed (int): Seed of the course, shared by all islands.
+        generations (int): Number of generations to evolve.
+        interval (int): Generations between two migrations, 0 to never migrate.
+        migrants (int): Number of genomes exchanged at every migration.
+        topology (str): Migration topology, see migration_target.
+        inboxes (list of Queue): Migrant inbox of every island.
+        results (Queue): Receives (index, generation, scores, best genome) after every evaluation.
+        decision (tuple): Decision interval and change threshold of the birds, see Flock.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    decision_interval, change_threshold = decision
+    evaluator = GameEvaluator(Game(headless=True, decision_interval=decision_interval, change_threshold=change_threshold))
+    genomes = random_genomes(size, rng)
+    for generation in range(generations):
+        scores = evaluate_fitness(evaluator, genomes, course_seed)
+        results.put((index, generation, scores.copy(), genomes[int(np.argmax(scores))].copy()))
+
+        if interval and len(inboxes) > 1 and (generation + 1) % interval == 0 and generation + 1 < generations:
+            target = migration_target(index, len(inboxes), generation // interval, topology, course_seed)
+            migrate(genomes, scores, migrants, inboxes[target], inboxes[index])
+        genomes = reproduce(genomes, scores, rng)
+    evaluator.close()
+
+
+def run_islands(islands=None, seed=None, migration_interval=MIGRATION_INTERVAL, migrants=MIGRANTS, topology='ring',
+                metrics_path=METRICS_PATH, decision_interval=DECISION_INTERVAL, change_threshold=None):
+    """
+    Runs an island-model evolution, always headless.
+
+    The population of POPULATION_SIZE genomes is split evenly across the islands. Metrics and
+    best models are written like in training.run_evolution, for the population as a whole.
+
+    Args:
+        islands (int, optional): Number of islands, one per CPU core by default.
+        seed (int, optional): Seed of the island RNGs, the topology and the course.
+        migration_interval (int): Generations between two migrations, 0 to never migrate.
+        migrants (int): Number of genomes each island sends at every migration.
+        topology (str): 'ring' or 'random', see migration_target.
+        metrics_path (str): JSON Lines file the metrics of every generation are appended to.
+        decision_interval (int): Frames between two decisions of a bird, see Flock.
+        change_threshold (float, optional): State change that triggers a decision between intervals.
+
+    Returns:
+        dict: best_score and scores_history, the best score of every generation.
+    """
+    islands = islands or os.cpu_count()
+    sizes = np.diff(np.linspace(0, POPULATION_SIZE, islands + 1).astype(int))
+    if topology not in TOPOLOGIES:
+        raise ValueError(f'Unknown topology {topology!r}, expected one of {TOPOLOGIES}')
+    if not 0 < migrants <= sizes.min():
+        raise ValueError(f'Islands of {sizes.min()} genomes cannot exchange {migrants} migrants')
+
+    seed_sequence = np.random.SeedSequence(seed)
+    course_seed = int(np.random.default_rng(seed_sequence).integers(2 ** 32))  # Same course on every island
+    inboxes = [multiprocessing.Queue() for _ in range(islands)]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=evolve_island, daemon=True,
+                                         args=(index, int(size), island_seed, course_seed, NUMBER_GENERATION,
+                                               migration_interval, migrants, topology, inboxes, results,
+                                               (decision_interval, change_threshold)))
+                 for index, (size, island_seed) in enumerate(zip(sizes, seed_sequence.spawn(islands)))]
+    for process in processes:
+        process.start()
+
+    metrics = MetricsWriter(metrics_path)
+    best_score = -float('inf')
+    best_genome = None
+    scores_history = []
+    pending = {}  # Generation to the results received so far; islands may run a few generations apart
+    generation_start = time.perf_counter()
+    try:
+        for generation in range(NUMBER_GENERATION):
+            while len(pending.get(generation, ())) < islands:
+                try:
+                    index, island_generation, scores, genome = results.get(timeout=1)
+                except queue.Empty:
+                    if any(process.exitcode not in (None, 0) for process in processes):
+                        raise RuntimeError('An island process died')
+                    continue
+                pending.setdefault(island_generation, {})[index] = (scores, genome)
+
+            island_results = pending.pop(generation)
+            scores = np.concatenate([island_results[index][0] for index in range(islands)])
+            island_best = [int(island_results[index][0].max()) for index in range(islands)]
+            scores_history.append(int(scores.max()))
+
+            if scores_history[-1] > best_score:
+                best_score = scores_history[-1]
+                best_genome = island_results[int(np.argmax(island_best))][1]
+                os.makedirs('models', exist_ok=True)
+                to_network(best_genome).save(f'models/best_model_generation_{generation+1}.pth')
+                print(f"New best model saved with score: {best_score}")
+
+            now = time.perf_counter()
+            metrics.write(generation_metrics(generation + 1, scores, scores_history, now - generation_start))
+            generation_start = now
+            print(f"Generation {generation + 1} completed. High Score: {best_score} "
+                  f"(islands: {' '.join(map(str, island_best))})")
+        for process in processes:
+            process.join()
+    finally:
+        metrics.close()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    if best_genome is not None:
+        to_network(best_genome).save('models/model_exit.pth')
+        print(f"Final best model saved with score: {best_score}")
+    return {'best_score': best_score, 'scores_history': scores_history}
@@ -1,5 +1,63 @@
+import argparse
+
+from utils import CHECKPOINT_PATH, MIGRATION_INTERVAL, MIGRANTS, FITNESS_CACHE_SIZE, DECISION_INTERVAL
 from training import run_evolution
+from profiler import cprofile
+
+
+def positive_int(value):
+    """Parses a command line integer of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not a positive integer')
+    return number
+
 
 if __name__ == '__main__':
-    run_evolution()
-    
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Train Flocky Bird with a genetic algorithm.')
+    parser.add_argument('--headless', action='store_true', help='simulate without a window, as fast as possible')
+    parser.add_argument('--seed', type=int, default=None, help='seed of the evolution and of the courses')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes evaluating headless generations (0 for one per CPU core)')
+    parser.add_argument('--profile', action='store_true', help='print per-phase timing percentiles every generation')
+    parser.add_argument('--profile-dump', metavar='PATH', help='run under cProfile and dump the stats to PATH')
+    parser.add_argument('--checkpoint', metavar='PATH', default=CHECKPOINT_PATH,
+                        help='file the run is checkpointed to after every generation')
+    parser.add_argument('--no-checkpoint', action='store_true', help='do not write checkpoints')
+    parser.add_argument('--record', action='store_true',
+                        help='save a replay of every generation to replays/ (play them with replay.py)')
+    parser.add_argument('--resume', metavar='PATH', help='resume the run saved in a checkpoint file')
+    parser.add_argument('--spectate', type=float, nargs='?', const=30, metavar='FPS',
+                        help='watch training at full simulation speed, drawing FPS frames per second (default 30)')
+    parser.add_argument('--render-every', type=positive_int, default=1, metavar='N',
+                        help='draw one frame every N simulation steps')
+    parser.add_argument('--decision-interval', type=positive_int, default=DECISION_INTERVAL, metavar='K',
+                        help='run the networks every K frames, birds repeat their last action in between')
+    parser.add_argument('--change-threshold', type=float, metavar='T',
+                        help='also run the network of a bird whose state changed by more than T since its last decision')
+    parser.add_argument('--fitness-cache', type=int, nargs='?', const=FITNESS_CACHE_SIZE, default=0, metavar='N',
+                        help='remember N fitness values to skip known genomes in headless runs '
+                             f'(default {FITNESS_CACHE_SIZE})')
+    parser.add_argument('--islands', type=int, metavar='N',
+                        help='evolve N sub-populations in parallel processes with migration (0 for one per CPU core)')
+    parser.add_argument('--migration-interval', type=int, default=MIGRATION_INTERVAL,
+                        help='generations between two migrations in island mode')
+    parser.add_argument('--migrants', type=int, default=MIGRANTS, help='genomes sent by each island at every migration')
+    parser.add_argument('--topology', choices=['ring', 'random'], default='ring', help='migration topology of the islands')
+    args = parser.parse_args()
+    if args.islands is not None and (args.resume or args.record):
+        parser.error('--islands always runs headless and does not support --resume or --record')
+
+    with cprofile(args.profile_dump):
+        if args.islands is not None:
+            from islands import run_islands
+
+            run_islands(islands=args.islands or None, seed=args.seed, migration_interval=args.migration_interval,
+                        migrants=args.migrants, topology=args.topology, decision_interval=args.decision_interval,
+                        change_threshold=args.change_threshold)
+        else:
+            run_evolution(headless=args.headless, seed=args.seed, workers=args.workers or None, profile=args.profile,
+                          checkpoint_path=None if args.no_checkpoint else args.checkpoint, resume=args.resume,
+                          record=args.record, fitness_cache=args.fitness_cache,
+                          render_every=args.render_every, display_fps=args.spectate,
+                          decision_interval=args.decision_interval, change_threshold=args.change_threshold)
@@ -0,0 +1,75 @@
+import json
+import queue
+import threading
+
+import numpy as np
+
+
+def generation_metrics(generation, scores, best_scores, generation_time):
+    """
+    Summarizes one generation.
+
+    Args:
+        generation (int): Generation number, starting at 1.
+        scores (ndarray): Score of every bird of the generation.
+        best_scores (list of int): Best score of every generation so far, this one included.
+        generation_time (float): Wall time of the generation, in seconds.
+
+    Returns:
+        dict: JSON-serializable record. alive is the number of birds still flying at each pipe.
+    """
+    return {
+        'generation': generation,
+        'best': int(scores.max()),
+        'mean': float(scores.mean()),
+        'median': float(np.median(scores)),
+        'mean_best': float(np.mean(best_scores)),
+        'alive': np.bincount(scores)[::-1].cumsum()[::-1].tolist(),
+        'generation_time': generation_time,
+    }
+
+
+class MetricsWriter:
+    """
+    Appends metric records to a JSON Lines file from a background thread.
+
+    write() only queues the record, so the training loop never waits on the disk. Each line is
+    flushed as soon as it is written, so readers tailing the file see every generation.
+    """
+
+    def __init__(self, path, append=False):
+        """
+        Opens the metrics file and starts the writer thread.
+
+        Args:
+            path (str): Metrics file.
+            append (bool): If True, keep the existing records (e.g. when resuming a run).
+        """
+        self.file = open(path, 'a' if append else 'w')
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Writes queued records until a None sentinel is received."""
+        while True:
+            record = self.queue.get()
+            if record is None:
+                return
+            self.file.write(json.dumps(record) + '\n')
+            self.file.flush()
+
+    def write(self, record):
+        """
+        Queues a record.
+
+        Args:
+            record (dict): JSON-serializable record.
+        """
+        self.queue.put(record)
+
+    def close(self):
+        """Writes the queued records and closes the file."""
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
@@ -43,6 +43,8 @@ class NeuralNet(nn.Module):
     def predict(self, state):
         """
         Predicts the action probabilities from a given state.
+
+        The argmax is taken on the logits, the final softmax does not change it.
         
         Args:
             state (list or array): The state representation from the environment.
@@ -52,8 +54,8 @@ class NeuralNet(nn.Module):
         """
         state = torch.tensor(state, dtype=torch.float32).unsqueeze(0)  # Convert to tensor, add batch dimension
         with torch.no_grad():  # Disable gradient computation for inference
-            output = self.forward(state)
-        return output.argmax().item()  # Return the action with the highest probability
+            logits = self.net[:-1](state)  # Skip the softmax layer
+        return logits.argmax().item()  # Return the action with the highest probability
 
     def save(self, filepath):
         """
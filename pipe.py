@@ -1,63 +1,86 @@
-import pygame as pg
-from random import randint
-
-from utils import WIDTH, GROUND_LEVEL, MIN_GAP, MAX_GAP, PIPE_SPEED
+from utils import WIDTH, PIPE_SIZE, Rect
+from course import Course
 
 class PipePair:
     """
     Represents a pair of pipes (top and bottom) for Flappy Bird game.
 
+    The pipes follow a precomputed Course: the rects always hold the pair currently on screen.
+
     Attributes:
         pipe_bottom_image (Surface): The image for the bottom pipe.
         pipe_top_image (Surface): The image for the top pipe, flipped.
         pipe_bottom_rect (Rect): Rect for bottom pipe.
         pipe_top_rect (Rect): Rect for top pipe.
+        course (Course): The sequence of pipe pairs.
+        frame (int): Number of updates since the start of the course.
     """
-    def __init__(self) -> None:
-        """Initialize the pipe pair with images and default positions."""
-        self.load_images()
+    def __init__(self, headless=False, seed=None) -> None:
+        """
+        Initialize the pipe pair with images and default positions.
+
+        Args:
+            headless (bool): If True, skip loading images (and pygame) and only keep the collision rects.
+            seed (int, optional): Seed of the course, random if None.
+        """
+        size = PIPE_SIZE
+        if not headless:
+            self.load_images()
+            size = self.pipe_bottom_image.get_size()
+        self.pipe_bottom_rect = Rect((0, 0), size)
+        self.pipe_top_rect = Rect((0, 0), size)
+        self.restart(seed)
+
+    def restart(self, seed=None) -> None:
+        """
+        Restart from the first pipe of the course of a seed, so that the same seed always gives the same course.
+
+        Args:
+            seed (int, optional): Seed of the course, random if None.
+        """
+        self.course = Course(seed)
+        self.frame = 0
         self.reset()
 
     def load_images(self):
-        """Load and set up the pipe images."""
-        self.pipe_bottom_image = pg.image.load('sprites/pipe-green.png').convert_alpha()
-        self.pipe_top_image = pg.transform.flip(self.pipe_bottom_image, False, True)
-        self.pipe_bottom_rect = self.pipe_bottom_image.get_rect()
-        self.pipe_top_rect = self.pipe_top_image.get_rect()
+        """Set up the pipe images from the shared asset cache."""
+        from assets import pipe_images
+
+        self.pipe_bottom_image, self.pipe_top_image = pipe_images()
 
     def update(self) -> None:
         """
         Update the position of the pipes moving them left based on the pipe speed.
-        Reset if the pipes go off screen.
+        The next pair of the course takes over once the pipes go off screen.
         """
-        self.pipe_bottom_rect.x -= PIPE_SPEED
-        self.pipe_top_rect.x -= PIPE_SPEED
-
-        if self.pipe_bottom_rect.right < 0:
-            self.reset()
+        self.frame += 1
+        self.reset()
 
     def render(self, display) -> None:
         """
-        Render the pipes on the given display.
+        Render the pipes on the given display, including upcoming pairs already on screen.
 
         Args:
             display (Surface): The game screen where pipes will be drawn.
+
+        Returns:
+            list of Rect: The areas drawn.
         """
-        display.blit(self.pipe_bottom_image, self.pipe_bottom_rect)
-        display.blit(self.pipe_top_image, self.pipe_top_rect)
+        drawn = []
+        for x, top, gap in zip(*self.course.upcoming(self.frame, 2)):
+            if x < WIDTH:
+                drawn.append(display.blit(self.pipe_bottom_image, (int(x), int(top + gap))))
+                drawn.append(display.blit(self.pipe_top_image, (int(x), int(top) - self.pipe_top_rect.height)))
+        return drawn
 
     def reset(self) -> None:
         """
-        Reset the pipes to the right of the screen with random gaps and positions.
+        Move the rects to the pipe pair on screen at the current frame.
         """
-        # Set x position to the right edge of the screen
-        self.pipe_bottom_rect.x = WIDTH
-        self.pipe_top_rect.x = WIDTH
-
-        # Set random positions for the pipes
-        pip_tip = 60  # Minimum distance from pipe ends to the screen top/bottom
-        gap = randint(MIN_GAP, MAX_GAP)  # Random gap between top and bottom pipes
-        top_y = randint(pip_tip, GROUND_LEVEL - pip_tip - gap)
+        index = self.course.next_pipe(0, self.frame)
+        top_y, gap = self.course.pipe(index)
 
+        self.pipe_bottom_rect.x = self.course.x(index, self.frame)
+        self.pipe_top_rect.x = self.pipe_bottom_rect.x
         self.pipe_top_rect.bottom = top_y
         self.pipe_bottom_rect.top = top_y + gap
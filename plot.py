@@ -1,43 +1,125 @@
-import matplotlib.pyplot as plt
-from IPython import display
-from utils import NUMBER_GENERATION  
+"""
+Live training chart, drawn in its own process by tailing the metrics file.
 
-plt.ion()  # Enable interactive mode
+Usage:
+    python plot.py metrics.jsonl
 
-def plot(scores, mean_scores):
+Training never waits on this process: it only appends records to the metrics file. Once the last
+generation is drawn, the chart is saved as training_progress.png next to the metrics file and the
+process exits.
+"""
+import argparse
+import json
+import os
+import time
+
+# Backends drawing to files only: there is no window whose closing ends the chart
+NON_INTERACTIVE_BACKENDS = ('agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template')
+
+
+def read_records(file):
     """
-    Plots the scores and mean scores over the generations and updates the plot live during training.
+    Reads the complete lines appended to a metrics file since the last call.
 
     Args:
-        scores (list of int): List of scores per generation.
-        mean_scores (list of float): List of mean scores calculated over the scores up to the current generation.
+        file (file): Metrics file opened for reading.
 
-    This function is designed to be called within a training loop to visualize the progress.
+    Returns:
+        list of dict: The new records.
     """
-    display.clear_output(wait=True)  # Clear the output to make way for the new plot
-    display.display(plt.gcf())  # Display the figure
+    records = []
+    while True:
+        position = file.tell()
+        line = file.readline()
+        if not line.endswith('\n'):
+            file.seek(position)  # Partial line, read it again once it is complete
+            return records
+        records.append(json.loads(line))
 
-    plt.clf()  # Clear the current figure
-    fig = plt.gcf()  # Get the current figure
 
+def plot(records, output=None):
+    """
+    Plots the scores over the generations.
+
+    Args:
+        records (list of dict): Metric records, one per generation.
+        output (str, optional): File the figure is saved to.
+    """
+    import matplotlib.pyplot as plt
+
+    generations = [record['generation'] for record in records]
+    best = [record['best'] for record in records]
+    mean_best = [record['mean_best'] for record in records]
+
+    plt.clf()  # Clear the current figure
     plt.title('Training Progress')
     plt.xlabel('Number of Games')
     plt.ylabel('Score')
-    
-    plt.plot(scores, label='Scores')  # Plot the raw scores
-    plt.plot(mean_scores, label='Mean Scores')  # Plot the mean scores
+
+    plt.plot(generations, best, label='Scores')  # Plot the best score of each generation
+    plt.plot(generations, mean_best, label='Mean Scores')  # Plot the running mean of the best scores
+    plt.plot(generations, [record['mean'] for record in records], label='Population Mean')
+    plt.plot(generations, [record['median'] for record in records], label='Population Median')
 
     plt.ylim(ymin=0)  # Set the minimum y value to 0 for clarity
 
     # Annotate the latest points on the graph
-    plt.text(len(scores)-1, scores[-1], str(scores[-1]))
-    plt.text(len(mean_scores)-1, mean_scores[-1], str(mean_scores[-1]))
+    plt.text(generations[-1], best[-1], str(best[-1]))
+    plt.text(generations[-1], mean_best[-1], f'{mean_best[-1]:.2f}')
 
     plt.legend()  # Add a legend to clarify plot lines
 
-    # Save the figure at the end of training
-    if len(scores) == NUMBER_GENERATION:
-        plt.savefig("training_progress.png")
+    if output:
+        plt.savefig(output)
+
+
+def follow(path, total_generations=None, interval=0.5):
+    """
+    Redraws the chart whenever new records are appended to the metrics file.
+
+    Returns once the last generation of the run is drawn and saved, or once the window is closed.
+    On a non-interactive backend there is no window: without total_generations, it returns after
+    saving the first records it reads.
+
+    Args:
+        path (str): Metrics file.
+        total_generations (int, optional): Length of the run.
+        interval (float): Seconds between two checks of the file.
+    """
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    windowed = matplotlib.get_backend().lower() not in NON_INTERACTIVE_BACKENDS
+    output = os.path.join(os.path.dirname(path), 'training_progress.png')
+    plt.ion()  # Enable interactive mode
+    while not os.path.exists(path):
+        time.sleep(interval)
+
+    records = []
+    with open(path) as file:
+        while not (windowed and records and not plt.fignum_exists(1)):  # Until the window is closed
+            new_records = read_records(file)
+            if new_records:
+                records.extend(new_records)
+                if total_generations is None:
+                    finished = not windowed
+                else:
+                    finished = records[-1]['generation'] >= total_generations
+                plot(records, output if finished else None)
+                if finished:
+                    return
+            if windowed:
+                plt.pause(interval)
+            else:
+                time.sleep(interval)
+
+
+if __name__ == '__main__':
+    from utils import NUMBER_GENERATION
+
+    parser = argparse.ArgumentParser(description='Plot training metrics live.')
+    parser.add_argument('path', help='metrics file written by the training')
+    parser.add_argument('--generations', type=int, default=NUMBER_GENERATION, help='length of the run')
+    args = parser.parse_args()
 
-    plt.show(block=False)  # Display the plot without blocking the rest of the program
-    plt.pause(0.1)  # Pause briefly so updates are visible
+    follow(args.path, args.generations)
@@ -0,0 +1,78 @@
+import numpy as np
+
+from genome import layer_views
+
+class PopulationPolicy:
+    """
+    Evaluates the neural networks of a whole population in one batched forward pass.
+
+    The weights of every network are read as zero-copy views on the population's genome
+    matrix, so a frame costs one batched matmul chain instead of one NeuralNet.predict call
+    per bird. It runs in NumPy: games and evaluation workers never need to import torch.
+
+    Attributes:
+        weights (list of ndarray): Weights of each linear layer, shape (N, out, in).
+        biases (list of ndarray): Biases of each linear layer, shape (N, out).
+        subset_index (ndarray): Rows the layers were last gathered for, None until a subset is asked.
+        subset_layers (list of tuple): The (weight, bias) of each layer gathered for subset_index.
+    """
+
+    def __init__(self, genomes):
+        """
+        Wraps the layers of a genome matrix.
+
+        Args:
+            genomes (ndarray): float32 matrix of shape (N, N_PARAMS), one genome per bird.
+        """
+        self.size = len(genomes)
+        self.weights = []
+        self.biases = []
+        for weight, bias in layer_views(genomes):
+            self.weights.append(weight)
+            self.biases.append(bias)
+        self.subset_index = None
+        self.subset_layers = None
+
+    def decide(self, states, index=None):
+        """
+        Computes the action of every bird from its state.
+
+        The argmax is taken on the logits: the softmax of the output layer does not change it.
+
+        Args:
+            states (ndarray): Array of shape (M, 4), one state per bird.
+            index (ndarray, optional): Rows of the population the states belong to, all by default.
+
+        Returns:
+            ndarray: Array of M actions, 1 to flap.
+        """
+        x = np.asarray(states, dtype=np.float32)
+        if index is None or len(index) == self.size:
+            layers = zip(self.weights, self.biases)
+        else:
+            layers = self.gather(index)
+        for i, (weight, bias) in enumerate(layers):
+            x = np.matmul(weight, x[:, :, None])[:, :, 0] + bias
+            if i < len(self.weights) - 1:
+                np.maximum(x, 0, out=x)
+        return x.argmax(axis=1)
+
+    def gather(self, index):
+        """
+        Returns the layers of a subset of the population, gathering them only when the subset changes.
+
+        The flock passes the same live index every frame until a bird dies, so the copy is paid once
+        per death instead of once per frame.
+
+        Args:
+            index (ndarray): Rows of the population.
+
+        Returns:
+            list of tuple: The (weight, bias) of each layer, restricted to the rows of index.
+        """
+        cached = self.subset_index
+        if cached is not index and (cached is None or len(cached) != len(index)
+                                    or not np.array_equal(cached, index)):
+            self.subset_layers = [(weight[index], bias[index]) for weight, bias in zip(self.weights, self.biases)]
+            self.subset_index = index
+        return self.subset_layers
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from contextlib import contextmanager
+import cProfile
+from time import perf_counter_ns
+
+import numpy as np
+
+class Profiler:
+    """
+    Collects per-phase timings of a loop with perf_counter_ns.
+
+    Phases are timed as laps: start() marks the beginning of a loop, and each lap(phase) charges
+    the time since the previous mark to that phase. Samples are kept until reset(), typically
+    once per generation after reading the summary.
+
+    Attributes:
+        samples (defaultdict): Phase name to list of lap durations in nanoseconds.
+    """
+    enabled = True
+
+    def __init__(self):
+        """Initializes an empty profiler."""
+        self.samples = defaultdict(list)
+        self.last = perf_counter_ns()
+
+    def start(self):
+        """Marks the beginning of a timed section without charging any phase."""
+        self.last = perf_counter_ns()
+
+    def lap(self, phase):
+        """
+        Charges the time since the previous mark to a phase.
+
+        Args:
+            phase (str): Name of the phase that just ended.
+        """
+        now = perf_counter_ns()
+        self.samples[phase].append(now - self.last)
+        self.last = now
+
+    def summary(self):
+        """
+        Summarizes the samples of every phase.
+
+        Returns:
+            dict: Phase name to count, total in milliseconds and mean, p50, p90, p99 and max in microseconds.
+        """
+        summary = {}
+        for phase, samples in self.samples.items():
+            micros = np.asarray(samples) / 1e3
+            p50, p90, p99 = np.percentile(micros, [50, 90, 99])
+            summary[phase] = {
+                'count': len(micros),
+                'total_ms': float(micros.sum() / 1e3),
+                'mean_us': float(micros.mean()),
+                'p50_us': float(p50),
+                'p90_us': float(p90),
+                'p99_us': float(p99),
+                'max_us': float(micros.max()),
+            }
+        return summary
+
+    def reset(self):
+        """Drops every sample."""
+        self.samples.clear()
+
+
+class NullProfiler:
+    """Profiler that records nothing, used when profiling is disabled."""
+    enabled = False
+
+    def start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def summary(self):
+        return {}
+
+    def reset(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def format_summary(summary):
+    """
+    Formats a profiler summary as a table, slowest phase first.
+
+    Args:
+        summary (dict): Output of Profiler.summary().
+
+    Returns:
+        str: One line per phase.
+    """
+    lines = [f"{'phase':<16}{'count':>8}{'total ms':>11}{'p50 us':>10}{'p90 us':>10}{'p99 us':>10}"]
+    for phase, stats in sorted(summary.items(), key=lambda item: -item[1]['total_ms']):
+        lines.append(f"{phase:<16}{stats['count']:>8}{stats['total_ms']:>11.1f}"
+                     f"{stats['p50_us']:>10.1f}{stats['p90_us']:>10.1f}{stats['p99_us']:>10.1f}")
+    return '\n'.join(lines)
+
+
+@contextmanager
+def cprofile(path=None):
+    """
+    Runs the enclosed block under cProfile and dumps the stats, if a path is given.
+
+    The dump can be read with pstats or snakeviz. Sampling profilers such as py-spy need no
+    hook: every phase of the game loop is its own function.
+
+    Args:
+        path (str, optional): File the stats are written to. Nothing is profiled if None.
+    """
+    if path is None:
+        yield
+        return
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
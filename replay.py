@@ -0,0 +1,186 @@
+"""
+Compact recordings of generations and their deterministic playback.
+
+A replay is the course seed plus one bit per bird per frame telling whether the bird flapped.
+Physics and courses are deterministic, so this is enough to rebuild every bird's flight without
+loading or evaluating any neural network.
+
+Usage:
+    python replay.py replays/generation_12.npz [--bird 3] [--speed 4] [--start 1200]
+
+Controls during playback: right/left arrows seek 5 seconds forward/backward, up/down double or
+halve the speed, space pauses, escape quits.
+"""
+import argparse
+
+import numpy as np
+
+from utils import FPS
+
+
+class Replay:
+    """
+    Recorded flaps of a population on one course.
+
+    Attributes:
+        seed (int): Seed of the course.
+        size (int): Number of recorded birds.
+        flaps (ndarray[uint8]): Bit-packed flaps, shape (frames, ceil(size / 8)).
+    """
+
+    def __init__(self, seed, size, flaps):
+        """
+        Wraps recorded flaps.
+
+        Args:
+            seed (int): Seed of the course.
+            size (int): Number of recorded birds.
+            flaps (ndarray[uint8]): Bit-packed flaps, one row per frame.
+        """
+        self.seed = int(seed)
+        self.size = int(size)
+        self.flaps = np.asarray(flaps, dtype=np.uint8).reshape(-1, (self.size + 7) // 8)
+
+    def __len__(self):
+        """Returns the number of recorded frames."""
+        return len(self.flaps)
+
+    def frame(self, frame):
+        """
+        Unpacks the flaps of one frame.
+
+        Args:
+            frame (int): Frame number.
+
+        Returns:
+            ndarray[bool]: One flag per bird, all False past the end of the recording.
+        """
+        if frame >= len(self):
+            return np.zeros(self.size, dtype=bool)
+        return np.unpackbits(self.flaps[frame], count=self.size).astype(bool)
+
+    def select(self, birds):
+        """
+        Extracts the recording of some of the birds.
+
+        Args:
+            birds (list of int): Indices of the birds to keep.
+
+        Returns:
+            Replay: Replay of the selected birds, in the given order.
+        """
+        flaps = np.unpackbits(self.flaps, axis=1, count=self.size)[:, birds]
+        return Replay(self.seed, len(birds), np.packbits(flaps, axis=1))
+
+    def save(self, filepath):
+        """
+        Saves the replay to a compressed .npz file.
+
+        Args:
+            filepath (str): Path to save the file.
+        """
+        np.savez_compressed(filepath, seed=self.seed, size=self.size, flaps=self.flaps)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Loads a replay saved with save().
+
+        Args:
+            filepath (str): Path of the file.
+
+        Returns:
+            Replay: The loaded replay.
+        """
+        with np.load(filepath) as data:
+            return cls(data['seed'], data['size'], data['flaps'])
+
+
+class ReplayPolicy:
+    """Policy answering each decision with the recorded flaps of the current frame."""
+
+    def __init__(self, replay, pipe):
+        """
+        Args:
+            replay (Replay): The recording to play back.
+            pipe (PipePair): Pipes of the game, whose frame counter is the current frame.
+        """
+        self.replay = replay
+        self.pipe = pipe
+
+    def decide(self, states, index=None):
+        """
+        Returns the recorded actions of the given birds for the current frame.
+
+        Args:
+            states (ndarray): Ignored, the actions were recorded.
+            index (ndarray, optional): Rows of the population to decide for, all by default.
+
+        Returns:
+            ndarray: One action per bird, 1 to flap.
+        """
+        flaps = self.replay.frame(self.pipe.frame)
+        return (flaps if index is None else flaps[index]).astype(np.int64)
+
+
+def play(replay, speed=1.0, start=0):
+    """
+    Renders a replay, with seeking and speeds above real time.
+
+    Args:
+        replay (Replay): The recording to play back.
+        speed (float): Playback speed, 1 for real time.
+        start (int): Frame to start rendering from; earlier frames are simulated without drawing.
+    """
+    import pygame as pg
+    from pygame.locals import QUIT, KEYDOWN, K_ESCAPE, K_RIGHT, K_LEFT, K_UP, K_DOWN, K_SPACE
+    from game import Game
+
+    game = Game()
+    game.load_replay(replay)
+    seek, paused = start, False
+
+    while True:
+        if seek is not None:
+            if seek < game.pipe.frame:
+                game.load_replay(replay)  # Rewinding means simulating again from the first frame
+            while game.pipe.frame < seek and game.is_running():
+                game.update()
+            seek = None
+
+        for event in pg.event.get():
+            if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                pg.quit()
+                return
+            if event.type == KEYDOWN:
+                if event.key == K_RIGHT:
+                    seek = game.pipe.frame + 5 * FPS
+                elif event.key == K_LEFT:
+                    seek = max(0, game.pipe.frame - 5 * FPS)
+                elif event.key == K_UP:
+                    speed *= 2
+                elif event.key == K_DOWN:
+                    speed /= 2
+                elif event.key == K_SPACE:
+                    paused = not paused
+
+        if seek is None and not paused and game.is_running():
+            # Above the display rate, several frames are simulated per frame drawn
+            steps = max(1, int(speed))
+            for _ in range(steps):
+                if game.is_running():
+                    game.update()
+            game.fps = FPS * speed / steps
+        game.render()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Play back a recorded generation.')
+    parser.add_argument('replay', help='replay file written with --record')
+    parser.add_argument('--bird', type=int, nargs='*', help='indices of the birds to show, all by default')
+    parser.add_argument('--speed', type=float, default=1.0, help='playback speed, 1 for real time')
+    parser.add_argument('--start', type=int, default=0, help='frame to start playing from')
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    play(replay.select(args.bird) if args.bird else replay, speed=args.speed, start=args.start)
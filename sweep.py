@@ -0,0 +1,257 @@
+"""
+Hyperparameter sweeps: isolated headless training runs over a grid or a random search.
+
+Usage:
+    python sweep.py sweep.json [--workers 4] [--cache sweeps/cache] [--output sweeps/summary.csv]
+
+A spec is a JSON file. Keys of "grid" are constants of utils.py, each with the list of values to try:
+    {
+        "grid": {"MUTATION_RATE": [0.05, 0.15], "NUM_PARENTS": [4, 8]},
+        "seeds": [0, 1, 2],
+        "generations": 30,
+        "target_score": 50
+    }
+A random search gives "random" and "samples" instead, and optionally a "seed" for the sampling:
+    "random": {"MUTATION_RATE": {"loguniform": [0.01, 0.3]}, "MUTATION_SCALE": {"uniform": [0.05, 0.5]},
+               "NUM_PARENTS": {"int": [2, 12]}, "PIPE_SPEED": [3, 4, 5]}
+A list draws one of its values, uniform and loguniform a float, int an integer (bounds included).
+
+Every job runs in a fresh process in which the constants are patched before any other module is
+imported, so the modules reading them with from-imports see the sweep values. Derived constants are
+not recomputed: GROUND_LEVEL must be set explicitly along with HEIGHT.
+
+Results are cached on disk by configuration, seed and number of generations: running a sweep
+again, or after an interruption, only runs the jobs missing from the cache.
+"""
+import argparse
+from contextlib import redirect_stdout
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+import utils
+
+
+def sample_value(rng, spec):
+    """
+    Draws one value of a random search parameter.
+
+    Args:
+        rng (numpy.random.Generator): Random number generator.
+        spec (list or dict): Values to choose from, or {'uniform' | 'loguniform' | 'int': [low, high]}.
+
+    Returns:
+        The drawn value, as a JSON-serializable Python scalar.
+    """
+    if isinstance(spec, list):
+        return spec[rng.integers(len(spec))]
+    (kind, (low, high)), = spec.items()
+    if kind == 'uniform':
+        return float(rng.uniform(low, high))
+    if kind == 'loguniform':
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+    if kind == 'int':
+        return int(rng.integers(low, high, endpoint=True))
+    raise ValueError(f'Unknown distribution {kind!r}')
+
+
+def configurations(spec):
+    """
+    Expands a sweep spec into configurations.
+
+    Args:
+        spec (dict): The sweep spec, with either 'grid' or 'random' and 'samples'.
+
+    Returns:
+        list of dict: Constant name to value, one dict per configuration.
+    """
+    parameters = spec.get('grid') or spec.get('random') or {}
+    for name in parameters:
+        if not name.isupper() or not hasattr(utils, name):
+            raise ValueError(f'{name} is not a constant of utils.py')
+    if 'grid' in spec:
+        names = list(parameters)
+        return [dict(zip(names, values)) for values in itertools.product(*parameters.values())]
+    rng = np.random.default_rng(spec.get('seed'))
+    return [{name: sample_value(rng, values) for name, values in parameters.items()} for _ in range(spec['samples'])]
+
+
+def job_key(config, seed, generations):
+    """Returns the cache key of a job: a hash of its configuration, seed and number of generations."""
+    job = json.dumps({'config': config, 'seed': seed, 'generations': generations}, sort_keys=True)
+    return hashlib.sha256(job.encode()).hexdigest()[:16]
+
+
+def run_job(config, seed, generations, directory):
+    """
+    Runs one headless training (in a fresh worker process).
+
+    Args:
+        config (dict): Constants of utils.py to patch.
+        seed (int): Seed of the run.
+        generations (int): Number of generations.
+        directory (str): Directory for the job's metrics and log.
+
+    Returns:
+        dict: The results of run_evolution.
+    """
+    for name, value in {**config, 'NUMBER_GENERATION': generations}.items():
+        setattr(utils, name, value)
+    from training import run_evolution  # Imported only now, so it reads the patched constants
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'log.txt'), 'w') as log, redirect_stdout(log):
+        return run_evolution(headless=True, seed=seed, checkpoint_path=None, live_plot=False, save_models=False,
+                             metrics_path=os.path.join(directory, 'metrics.jsonl'))
+
+
+def run_keyed_job(job):
+    """Runs run_job on a (key, config, seed, generations, directory) tuple and returns the key with its results."""
+    key, *arguments = job
+    return key, run_job(*arguments)
+
+
+def time_to_score(results, target):
+    """
+    Finds when a run first reached a score.
+
+    Args:
+        results (dict): The results of run_evolution.
+        target (int): The score to reach.
+
+    Returns:
+        tuple: Number of generations and seconds it took, (None, None) if the score was never reached.
+    """
+    for generation, score in enumerate(results['scores_history']):
+        if score >= target:
+            return generation + 1, results['elapsed'][generation]
+    return None, None
+
+
+def save_record(path, record):
+    """Writes a cache record atomically, so an interrupted sweep never leaves a partial one."""
+    with open(f'{path}.tmp', 'w') as file:
+        json.dump(record, file)
+    os.replace(f'{path}.tmp', path)
+
+
+def run_sweep(spec, workers=None, cache_dir='sweeps/cache'):
+    """
+    Runs every job of a sweep that is not cached yet, in a pool of fresh worker processes.
+
+    Args:
+        spec (dict): The sweep spec.
+        workers (int, optional): Number of jobs run in parallel, one per CPU core by default.
+        cache_dir (str): Directory of the result cache.
+
+    Returns:
+        list of dict: One record per job: configuration, seed and results.
+    """
+    generations = spec.get('generations', utils.NUMBER_GENERATION)
+    jobs = [(config, seed) for config in configurations(spec) for seed in spec.get('seeds', [0])]
+    os.makedirs(cache_dir, exist_ok=True)
+
+    records, missing = [], {}
+    for config, seed in jobs:
+        key = job_key(config, seed, generations)
+        path = os.path.join(cache_dir, f'{key}.json')
+        if os.path.exists(path):
+            with open(path) as file:
+                records.append(json.load(file))
+        else:
+            missing[key] = (config, seed)
+    print(f'{len(jobs)} jobs, {len(records)} cached, {len(missing)} to run')
+
+    # One process per job: constants are patched at import, so a worker must never be reused
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(workers, maxtasksperchild=1) as pool:
+        pending = [(key, config, seed, generations, os.path.join(cache_dir, key))
+                for key, (config, seed) in missing.items()]
+        for key, results in pool.imap_unordered(run_keyed_job, pending):
+            config, seed = missing[key]
+            record = {'config': config, 'seed': seed, 'generations': generations, 'results': results}
+            save_record(os.path.join(cache_dir, f'{key}.json'), record)
+            records.append(record)
+            print(f"Done {config} seed {seed}: best score {record['results']['best_score']}")
+    return records
+
+
+def summarize(records, target):
+    """
+    Aggregates the runs of every configuration over its seeds.
+
+    Args:
+        records (list of dict): Records returned by run_sweep.
+        target (int): Score whose time-to-score is reported.
+
+    Returns:
+        list of dict: One row per configuration, best mean best score first.
+    """
+    runs = {}
+    for record in records:
+        runs.setdefault(json.dumps(record['config'], sort_keys=True), []).append(record['results'])
+
+    rows = []
+    for config, results in runs.items():
+        reached = [time_to_score(result, target) for result in results]
+        reached = [times for times in reached if times[0] is not None]
+        rows.append({
+            'config': config,
+            'seeds': len(results),
+            'best_score_mean': float(np.mean([result['best_score'] for result in results])),
+            'best_score_max': max(result['best_score'] for result in results),
+            'reached_target': len(reached),
+            'generations_to_target': float(np.mean([times[0] for times in reached])) if reached else None,
+            'seconds_to_target': float(np.mean([times[1] for times in reached])) if reached else None,
+            'seconds_total': float(np.mean([result['elapsed'][-1] for result in results if result['elapsed']])),
+        })
+    return sorted(rows, key=lambda row: -row['best_score_mean'])
+
+
+def format_table(rows, target):
+    """
+    Formats summary rows as a table.
+
+    Args:
+        rows (list of dict): Output of summarize().
+        target (int): Score the time-to-score columns refer to.
+
+    Returns:
+        str: One line per configuration.
+    """
+    lines = [f"{'best mean':>10}{'best max':>10}{'reached':>9}{f'gens to {target}':>12}{f's to {target}':>10}"
+             f"{'total s':>9}  config"]
+    for row in rows:
+        generations = f"{row['generations_to_target']:.1f}" if row['reached_target'] else '-'
+        seconds = f"{row['seconds_to_target']:.1f}" if row['reached_target'] else '-'
+        lines.append(f"{row['best_score_mean']:>10.1f}{row['best_score_max']:>10}"
+                     f"{row['reached_target']:>5}/{row['seeds']:<3}{generations:>12}{seconds:>10}"
+                     f"{row['seconds_total']:>9.1f}  {row['config']}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a hyperparameter sweep of headless trainings.')
+    parser.add_argument('spec', help='JSON sweep spec')
+    parser.add_argument('--workers', type=int, default=0, help='jobs run in parallel (0 for one per CPU core)')
+    parser.add_argument('--cache', default='sweeps/cache', help='directory of the result cache')
+    parser.add_argument('--output', default='sweeps/summary.csv', help='CSV file the summary table is written to')
+    args = parser.parse_args()
+
+    with open(args.spec) as file:
+        spec = json.load(file)
+    target = spec.get('target_score', utils.SCORE_CAP)
+    rows = summarize(run_sweep(spec, args.workers or None, args.cache), target)
+
+    print(format_table(rows, target))
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ['config'])
+        writer.writeheader()
+        writer.writerows(rows)
@@ -1,94 +1,244 @@
-from random import random, choice
 import numpy as np
 import os
+import subprocess
+import sys
+import time
 
-from utils import *
-from network import NeuralNet
+from utils import (NUMBER_GENERATION, NUM_PARENTS, POPULATION_SIZE, MUTATION_RATE, MUTATION_SCALE, CHECKPOINT_PATH,
+                   METRICS_PATH, DECISION_INTERVAL)
 from game import Game
-from bird import Bird   
-from plot import plot
+from evaluation import GameEvaluator, ParallelEvaluator, CachedEvaluator
+from genome import random_genomes, to_network
+from checkpoint import CheckpointWriter, load_checkpoint
+from metrics import MetricsWriter, generation_metrics
+from profiler import Profiler, NULL_PROFILER, format_summary
 
-def evaluate_fitness(bird):
+CHUNK_ROWS = 256  # Genomes bred at a time, to bound the temporary arrays of large populations
+PLOT_EXIT_TIMEOUT = 10  # Seconds the live plot is given to draw and save the last generation
+
+def evaluate_fitness(evaluator, genomes, seed):
     """
-    Calculates the fitness of a bird based on its score.
-    :param bird: Bird object
-    :return: Fitness value as an integer score
+    Calculates the fitness of every genome based on its score on a course.
+    :param evaluator: GameEvaluator or ParallelEvaluator running the generation
+    :param genomes: Genome matrix of shape (N, N_PARAMS)
+    :param seed: Seed of the course
+    :return: Array of fitness values, one integer score per genome
     """
-    return bird.score
+    return evaluator.evaluate(genomes, seed)
 
-def selection(population, num_parents):
+def selection(genomes, fitness, num_parents):
     """
-    Selects the top scoring birds to be parents for the next generation.
-    :param population: List of Bird objects
-    :param num_parents: Number of top birds to select
-    :return: List of Bird objects that are selected as parents
+    Selects the top scoring genomes to be parents for the next generation.
+    :param genomes: Genome matrix of shape (N, N_PARAMS)
+    :param fitness: Array of N fitness values
+    :param num_parents: Number of top genomes to select
+    :return: Genome matrix of shape (num_parents, N_PARAMS), best first
     """
-    sorted_population = sorted(population, key=evaluate_fitness, reverse=True)
-    return sorted_population[:num_parents]
+    ranking = np.argsort(-fitness, kind='stable')  # Stable, so ties keep population order
+    return genomes[ranking[:num_parents]]
 
-def crossover(parent_1, parent_2):
+def crossover(parents, num_children, rng, out=None):
     """
-    Performs crossover between two parent birds to produce offspring.
-    :param parent_1: First parent Bird object
-    :param parent_2: Second parent Bird object
-    :return: Bird object as a child with mixed parameters
+    Performs uniform crossover between randomly paired parents to produce offspring.
+    Each weight of a child is copied from either of its two parents with equal probability.
+    Children are written CHUNK_ROWS at a time, so the temporaries stay small whatever the population size.
+    :param parents: Genome matrix of the parents
+    :param num_children: Number of children to produce
+    :param rng: numpy random Generator
+    :param out: Optional preallocated genome matrix of shape (num_children, N_PARAMS) to write the children to
+    :return: Genome matrix of shape (num_children, N_PARAMS)
     """
-    child_params = {}
-    for param in parent_1.nn.get_params().keys():
-        child_params[param] = parent_1.nn.get_params()[param] if random() > 0.5 else parent_2.nn.get_params()[param]
-    return Bird(NeuralNet(params=child_params))
+    if out is None:
+        out = np.empty((num_children, parents.shape[1]), dtype=parents.dtype)
+    parent_1 = rng.integers(len(parents), size=num_children)
+    parent_2 = rng.integers(len(parents), size=num_children)
+    for start in range(0, num_children, CHUNK_ROWS):
+        children = out[start:start + CHUNK_ROWS]
+        mask = rng.random(children.shape, dtype=np.float32) < 0.5
+        np.take(parents, parent_2[start:start + CHUNK_ROWS], axis=0, out=children)
+        np.copyto(children, parents[parent_1[start:start + CHUNK_ROWS]], where=mask)
+    return out
 
-def mutate(bird):
+def mutate(genomes, rng):
     """
-    Mutates a bird's neural network parameters.
-    :param bird: Bird object
-    :return: Bird object with mutated parameters
+    Mutates genomes in place, adding Gaussian noise to each weight with probability MUTATION_RATE.
+    Works CHUNK_ROWS genomes at a time, on the flat indices of the mutated weights.
+    :param genomes: C-contiguous genome matrix
+    :param rng: numpy random Generator
+    :return: The mutated genome matrix
     """
-    for param in bird.nn.get_params().keys():
-        if random() < MUTATION_RATE:
-            bird.nn.get_params()[param] += np.random.normal(0, MUTATION_SCALE)
-    return bird
+    for start in range(0, len(genomes), CHUNK_ROWS):
+        weights = genomes[start:start + CHUNK_ROWS].reshape(-1)  # A view, the matrix is contiguous
+        mutated = np.flatnonzero(rng.random(weights.size, dtype=np.float32) < MUTATION_RATE)
+        weights[mutated] += rng.standard_normal(len(mutated), dtype=np.float32) * np.float32(MUTATION_SCALE)
+    return genomes
 
-def run_evolution():
+def reproduce(genomes, fitness, rng, profiler=NULL_PROFILER, out=None):
+    """
+    Breeds the next generation: selection, crossover and mutation.
+    :param genomes: Genome matrix of the evaluated generation
+    :param fitness: Array of fitness values, one per genome
+    :param rng: numpy random Generator
+    :param profiler: Profiler timing each step
+    :param out: Optional genome matrix of the same shape, not genomes itself, to breed the children into
+    :return: Genome matrix of the next generation
+    """
+    parents = selection(genomes, fitness, NUM_PARENTS)
+    profiler.lap('selection')
+    children = crossover(parents, len(genomes), rng, out)
+    profiler.lap('crossover')
+    mutate(children, rng)
+    profiler.lap('mutate')
+    return children
+
+def stop_process(process, timeout):
+    """
+    Waits for a child process to exit, terminating it if it is still running after the timeout.
+    :param process: The subprocess.Popen of the child
+    :param timeout: Seconds the child is given to exit by itself
+    """
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.terminate()
+        process.wait()
+
+def run_evolution(headless=False, seed=None, workers=1, profile=False, checkpoint_path=CHECKPOINT_PATH, resume=None,
+                  record=False, metrics_path=METRICS_PATH, live_plot=None, fitness_cache=0,
+                  render_every=1, display_fps=None, decision_interval=DECISION_INTERVAL, change_threshold=None,
+                  save_models=True):
     """
     Runs the evolutionary process to train birds over multiple generations.
+    :param headless: If True, generations are simulated without a window, as fast as possible
+    :param seed: Seed of the random number generator used for evolution and courses
+    :param workers: Number of worker processes evaluating headless generations, None for one per core
+    :param profile: If True, time every phase of the game loop and of reproduction and print percentiles per generation
+    :param checkpoint_path: File the whole run is checkpointed to after every generation, None to disable
+    :param resume: Checkpoint file to resume the run from
+    :param record: If True, save a replay of every generation to replays/ (evaluates in-process)
+    :param metrics_path: JSON Lines file the metrics of every generation are appended to
+    :param live_plot: If True, chart the metrics live from a separate process, by default when not headless
+    :param fitness_cache: Number of fitness values remembered to skip re-simulating known genomes in headless runs, 0 to disable
+    :param render_every: In windowed mode, draw one frame every render_every simulation steps
+    :param display_fps: In windowed mode, simulate at full speed and draw this many frames per second (spectator mode)
+    :param decision_interval: Frames between two decisions of a bird, which repeats its last action in between
+    :param change_threshold: State change that makes a bird decide before the end of its interval, None to disable
+    :param save_models: If False, no model is written to models/ (and torch is never imported)
+    :return: Dictionary with the best score, the best and mean score histories, and the elapsed wall time
+             in seconds at the end of each generation run by this call
     """
-    game = Game()
-    population = [Bird(NeuralNet()) for _ in range(POPULATION_SIZE)]
-    game.set_population(population)
-    
-    best_score = -float('inf')
-    best_model = None
-    
-    scores_history = []
-    mean_scores_history = []
-    
-    for generation in range(NUMBER_GENERATION):
-        game.run_generation()
-        
-        scores = [bird.score for bird in game.birds]
-        current_best_score = max(scores)
-        scores_history.append(current_best_score)
-        mean_score = np.mean(scores_history)
-        mean_scores_history.append(mean_score)
-        
-        parents = selection(game.birds, NUM_PARENTS)
-        
-        if current_best_score > best_score:
-            best_score = current_best_score
-            best_model = parents[0].nn
-            if not os.path.exists('models'):
-                os.makedirs('models')
-            best_model.save(f'models/best_model_generation_{generation+1}.pth')
-            print(f"New best model saved with score: {best_score}")
+    rng = np.random.default_rng(seed)
+    profiler = Profiler() if profile else NULL_PROFILER
+    state = load_checkpoint(resume) if resume else None
+    if state:
+        # Genomes were evolved for the decision settings of the run, which override the arguments
+        decision_interval = state.get('decision_interval', 1)
+        change_threshold = state.get('change_threshold')
+    game_profiled = not (headless and workers != 1 and not record)  # The game shares the profiler
+    if not game_profiled:
+        evaluator = ParallelEvaluator(workers, decision_interval, change_threshold)
+    else:
+        evaluator = GameEvaluator(Game(headless=headless, profiler=profiler, record=record, render_every=render_every,
+                                       display_fps=display_fps, decision_interval=decision_interval,
+                                       change_threshold=change_threshold))
+    if headless and not record and fitness_cache:
+        evaluator = CachedEvaluator(evaluator, fitness_cache)  # Cached birds are not simulated, so nothing to draw or record
+    writer = CheckpointWriter() if checkpoint_path else None
+    metrics = MetricsWriter(metrics_path, append=bool(resume))
+    plotter = None
+    if live_plot if live_plot is not None else not headless:
+        plotter = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(__file__), 'plot.py'),
+                                    metrics_path, '--generations', str(NUMBER_GENERATION)])
+
+    if state:
+        rng.bit_generator.state = state['rng_state']
+        course_seed = state['course_seed']
+        best_score = state['best_score']
+        best_genome = np.array(state['best_genome'])
+        scores_history = state['scores_history']
+        mean_scores_history = state['mean_scores_history']
+        start_generation = state['generation'] + 1
+        # The checkpointed generation was already evaluated, breed its children right away
+        genomes = reproduce(state['genomes'], state['fitness'], rng)
+        del state
+        print(f"Resumed from {resume} after generation {start_generation}. High Score: {best_score}")
+    else:
+        genomes = random_genomes(POPULATION_SIZE, rng)
+        course_seed = int(rng.integers(2 ** 32))  # Every generation flies the same course, so scores compare fairly
+
+        best_score = -float('inf')
+        best_genome = None
+
+        scores_history = []
+        mean_scores_history = []
+        start_generation = 0
+
+    spare = None  # Genome matrix of the previous generation, reused to breed the next one into
+    run_start = time.perf_counter()
+    elapsed = []
+    completed = False
+    try:
+        for generation in range(start_generation, NUMBER_GENERATION):
+            generation_start = time.perf_counter()
+            profiler.start()
+            scores = evaluate_fitness(evaluator, genomes, course_seed)
+            if game_profiled:
+                profiler.start()  # The game's per-frame laps already timed the evaluation
+            else:
+                profiler.lap('evaluate')
+            current_best_score = int(scores.max())
+            scores_history.append(current_best_score)
+            mean_score = np.mean(scores_history)
+            mean_scores_history.append(float(mean_score))
         
-        next_gen = [mutate(crossover(choice(parents), choice(parents))) for _ in range(POPULATION_SIZE)]
-        game.reset(next_gen)
+            best_index = int(np.argmax(scores))  # The first best genome, the one selection ranks first
+            if current_best_score > best_score:
+                best_score = current_best_score
+                best_genome = genomes[best_index].copy()
+                if save_models:
+                    if not os.path.exists('models'):
+                        os.makedirs('models')
+                    to_network(best_genome).save(f'models/best_model_generation_{generation+1}.pth')
+                    print(f"New best model saved with score: {best_score}")
+                profiler.lap('save')
+
+            if record:
+                os.makedirs('replays', exist_ok=True)
+                evaluator.game.replay().save(f'replays/generation_{generation+1}.npz')
+                profiler.lap('record')
+
+            if writer:
+                writer.wait()  # The spare matrix is about to be overwritten, its checkpoint must be on disk
+                writer.save(checkpoint_path, {'genomes': genomes, 'fitness': scores, 'best_genome': best_genome},
+                            generation=generation, seed=seed, course_seed=course_seed, best_score=best_score,
+                            rng_state=rng.bit_generator.state, scores_history=list(scores_history),
+                            mean_scores_history=list(mean_scores_history), decision_interval=decision_interval,
+                            change_threshold=change_threshold)
+                profiler.lap('checkpoint')
         
-        plot(scores_history, mean_scores_history)
-        print(f"Generation {generation + 1} completed. High Score: {best_score}")
+            genomes, spare = reproduce(genomes, scores, rng, profiler, out=spare), genomes
+            metrics.write(generation_metrics(generation + 1, scores, scores_history,
+                                             time.perf_counter() - generation_start))
+            profiler.lap('metrics')
+            elapsed.append(time.perf_counter() - run_start)
+            print(f"Generation {generation + 1} completed. High Score: {best_score}")
+            if profile:
+                print(format_summary(profiler.summary()))
+                if isinstance(evaluator, CachedEvaluator):
+                    print(f"Fitness cache: {evaluator.hits} hits, {evaluator.misses} misses")
+                profiler.reset()
+        completed = True
+    finally:
+        evaluator.close()
+        metrics.close()
+        if plotter:
+            # The plot exits by itself once it has saved the last generation, which metrics.close() just flushed
+            stop_process(plotter, PLOT_EXIT_TIMEOUT if completed else 0)
+        if writer:
+            writer.close()
 
-    if best_model:
-        best_model.save('models/model_exit.pth')
+    if best_genome is not None and save_models:
+        to_network(best_genome).save('models/model_exit.pth')
         print(f"Final best model saved with score: {best_score}")
-
+    return {'best_score': best_score, 'scores_history': scores_history, 'mean_scores_history': mean_scores_history,
+            'elapsed': elapsed}
@@ -1,17 +1,13 @@
 from typing import Tuple
-import pygame as pg
-from enum import Enum
 
-# Type alias for a 2D vector
-v2 = pg.Vector2
-color = pg.Color
+# Pure constants and helpers: nothing here may import pygame, so that headless runs never load it
 
 # Constants
 WIDTH: int = 288
 HEIGHT: int = 512
 SCALE: int = 1.5
 FPS: int = 60
-BG_COLOR: color = (0, 0, 0)
+BG_COLOR: Tuple[int, int, int] = (0, 0, 0)
 GROUND_LEVEL: int = HEIGHT - 112
 FLAP_SPEED: int = -5
 GRAVITY: float = 0.75
@@ -20,6 +16,10 @@ PIPE_SPEED: int = 4
 MIN_GAP: int = 100
 MAX_GAP: int = 150
 SCORE_CAP: int = 50
+BIRD_SIZE: Tuple[int, int] = (34, 24)   # Size of the bird sprites, used when no sprites are loaded
+PIPE_SIZE: Tuple[int, int] = (52, 320)  # Size of the pipe sprites, used when no sprites are loaded
+DEATH_ANIMATION_FRAMES: int = 50        # Frames a dead bird keeps falling on screen
+DECISION_INTERVAL: int = 1              # Frames between two policy evaluations of a bird, which repeats its last action in between
 
 # Evolutionary parameters
 NUMBER_GENERATION: int = 50  # Number of generations to evolve
@@ -27,29 +27,51 @@ NUM_PARENTS: int = 6        # Number of parents to select for breeding
 POPULATION_SIZE: int = 200  # Total population size
 MUTATION_RATE: float = 0.15 # Probability of each weight being mutated
 MUTATION_SCALE: float = 0.2 # Standard deviation of the Gaussian noise added during mutation
+FITNESS_CACHE_SIZE: int = 10000 # Genome fitnesses remembered by an enabled fitness cache, least recently used evicted first
+MIGRATION_INTERVAL: int = 5 # Generations between two migrations in island mode
+MIGRANTS: int = 2           # Best genomes each island sends to its neighbour at every migration
+CHECKPOINT_PATH: str = 'checkpoints/latest.ckpt'  # Whole-run checkpoint, rewritten every generation
+METRICS_PATH: str = 'metrics.jsonl'                # Per-generation training metrics, one JSON record per line
 
-def rotate_sprite(sprite: pg.Surface, angle: float) -> pg.Surface:
+class Rect:
     """
-    Rotates a sprite around its center without changing its dimensions.
+    Integer rectangle with the subset of the pygame.Rect interface used by the game logic.
 
-    Args:
-    sprite (pg.Surface): The sprite image to rotate.
-    angle (float): The angle in degrees to rotate the sprite.
+    Pipes use it instead of pygame.Rect so that headless games run without importing pygame.
 
-    Returns:
-    pg.Surface: The rotated sprite image.
+    Attributes:
+        x (int): Left coordinate.
+        y (int): Top coordinate.
+        width (int): Width in pixels.
+        height (int): Height in pixels.
     """
-    orig_rect = sprite.get_rect()
-    rot_sprite = pg.transform.rotate(sprite, angle)
-    rot_rect = orig_rect.copy()
-    rot_rect.center = rot_sprite.get_rect().center
-    rot_sprite = rot_sprite.subsurface(rot_rect).copy()
-    return rot_sprite
-
-class Collision(Enum):
-    """
-    Enum for different types of collisions in the game.
-    """
-    PIPE = 0
-    SCORE = 1
-    NONE = 3
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, position: Tuple[int, int], size: Tuple[int, int]) -> None:
+        """Creates a rect from its top-left corner and its size."""
+        self.x, self.y = int(position[0]), int(position[1])
+        self.width, self.height = int(size[0]), int(size[1])
+
+    @property
+    def left(self) -> int:
+        return self.x
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def top(self) -> int:
+        return self.y
+
+    @top.setter
+    def top(self, value: int) -> None:
+        self.y = int(value)
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+    @bottom.setter
+    def bottom(self, value: int) -> None:
+        self.y = int(value) - self.height